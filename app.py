@@ -1,13 +1,24 @@
 from flask import Flask, render_template, request, jsonify, Response
+from flask.json.provider import DefaultJSONProvider
 import os
 import asyncio
-import json
+import concurrent.futures
+import functools
+import random
 from datetime import datetime
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import re
+import threading
 import time
+import orjson
+from async_lru import alru_cache
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:  # uvloop doesn't support Windows
+    uvloop = None
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -15,8 +26,19 @@ load_dotenv()
 from niflheim_x import Agent, tool, DictMemory
 from niflheim_x.core.types import Message, MessageRole
 from niflheim_adapters.gemini_llm_adapter import GeminiLLMAdapter
+from examples.safe_math import safe_eval
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.getenv('SECRET_KEY', 'niflheim-x-demo-key')
 
 # Configure logging
@@ -26,19 +48,54 @@ logger = logging.getLogger(__name__)
 # Global variables for DIRECT framework usage
 gemini_adapter = None
 agents = {}
-executor = ThreadPoolExecutor(max_workers=3)
+_init_lock = threading.Lock()
+_initialized = False
+
+# One long-lived event loop shared by every request, so the Gemini client and
+# its connection pool stay warm instead of being rebuilt per asyncio.run()
+loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+threading.Thread(target=loop.run_forever, name="niflheim-event-loop", daemon=True).start()
+
+# Longest wait for the next streamed chunk before /api/stream_demo gives up
+STREAM_CHUNK_TIMEOUT = 30
+
+def run_async(coro, timeout=30):
+    """Run a coroutine on the shared event loop and wait for its result"""
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout=timeout)
+    except Exception:
+        # Don't leave a timed-out task running on the loop after the request failed
+        future.cancel()
+        raise
+
+# Argument extraction for the manual tool fallbacks in tool_demo
+_LOCATION_RE = re.compile(r'in\s+(\w+)', re.IGNORECASE)
+_KNOWN_CITIES = ("Tokyo", "Paris", "New York", "London")
+_SEARCH_PREFIX_RE = re.compile(r'[Ss]earch for|[Ff]ind')
+
+# Keyword dispatch patterns for the lowercased task; like plain substring checks they
+# match anywhere, so "temperatures", "forecasts" or "planning" still route
+_WEATHER_RE = re.compile(r'weather|temperature|forecast')
+_SEARCH_RE = re.compile(r'search|tutorial|find')
+_TOOL_MATH_RE = re.compile(r'calculate|math|equation|solve|number|[-+*/=]')
+_TRAVEL_RE = re.compile(r'trip|travel|visit|plan|vacation|holiday')
+_MULTI_MATH_RE = re.compile(r'calculate|math|solve|compute')
+
+# Deletes every character the calculator accepts; anything left over is invalid
+_STRIP_ALLOWED_CHARS = str.maketrans('', '', '0123456789+-*/.() ')
 
 # Define tools DIRECTLY
 @tool(description="Calculate a mathematical expression safely")
+@functools.lru_cache(maxsize=1024)
 def calculate(expression: str) -> str:
     """Calculate a mathematical expression safely."""
     try:
         # Only allow basic mathematical operations
-        allowed_chars = set('0123456789+-*/.() ')
-        if not all(c in allowed_chars for c in expression):
+        if expression.translate(_STRIP_ALLOWED_CHARS):
             return "Error: Invalid characters in expression"
         
-        result = eval(expression)
+        result = safe_eval(expression)
         return f"Result: {result}"
     except Exception as e:
         return f"Error: {str(e)}"
@@ -46,8 +103,6 @@ def calculate(expression: str) -> str:
 @tool(description="Get weather for any location")
 def get_weather(location: str) -> str:
     """Get weather for any location. Works with city names, countries, or any location."""
-    import random
-    
     # Clean up the location name
     location = location.strip()
     if not location:
@@ -62,19 +117,39 @@ def get_weather(location: str) -> str:
     
     return f"Weather in {location}: {condition}, {temp}°C, humidity {humidity}%, wind {wind} km/h"
 
+# Canned results returned by the demo search tool
+_SEARCH_BODY = (
+    "1. Official Python Tutorial - https://docs.python.org/3/tutorial/\n"
+    "   Comprehensive guide covering all Python basics and advanced topics\n\n"
+    "2. Real Python Tutorials - https://realpython.com/\n"
+    "   High-quality Python tutorials for beginners to advanced\n\n"
+    "3. Python.org Learning Resources - https://www.python.org/about/gettingstarted/\n"
+    "   Official learning resources and documentation\n\n"
+    "4. Codecademy Python Course - Interactive coding lessons\n\n"
+    "5. YouTube: Python for Beginners - Free video tutorials\n\n"
+    "All these resources provide excellent Python learning materials!"
+)
+
 @tool(description="Search for information")
 def search_web(query: str) -> str:
     """Search for information on the web."""
     # For demo purposes, provide helpful search results
-    return f"Search results for '{query}':\n\n1. Official Python Tutorial - https://docs.python.org/3/tutorial/\n   Comprehensive guide covering all Python basics and advanced topics\n\n2. Real Python Tutorials - https://realpython.com/\n   High-quality Python tutorials for beginners to advanced\n\n3. Python.org Learning Resources - https://www.python.org/about/gettingstarted/\n   Official learning resources and documentation\n\n4. Codecademy Python Course - Interactive coding lessons\n\n5. YouTube: Python for Beginners - Free video tutorials\n\nAll these resources provide excellent Python learning materials!"
+    return f"Search results for '{query}':\n\n{_SEARCH_BODY}"
 
 @tool(description="Get the current time")
 def get_current_time() -> str:
     """Get the current time."""
-    from datetime import datetime
     return f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
 
 def initialize_framework():
+    """Initialize the framework once per process; safe to call from any thread"""
+    global _initialized
+    with _init_lock:
+        if not _initialized:
+            _initialized = _setup_framework()
+        return _initialized
+
+def _setup_framework():
     """Initialize Niflheim-X framework components DIRECTLY"""
     global gemini_adapter, agents
     
@@ -95,34 +170,30 @@ def initialize_framework():
         # Create agents DIRECTLY and assign to global
         global agents
         agents.clear()  # Clear existing agents
-        # Create memory instances
-        assistant_memory = DictMemory()
-        math_memory = DictMemory()
-        weather_memory = DictMemory()
+        # One memory backend shared by all agents; each agent keeps its own
+        # session id inside it, so conversations stay isolated
+        shared_memory = DictMemory()
         
         agents["assistant"] = Agent(
                 llm=gemini_adapter,
+                memory_backend=shared_memory,
                 name="AI Assistant",
                 system_prompt="You are a helpful AI assistant with ACCESS TO TOOLS. You have the following tools available: get_weather(location), calculate(expression), get_current_time(), search_web(query). When a user asks for weather, immediately use get_weather tool. When asked for calculations, use calculate tool. When asked for time, use get_current_time tool. When asked to search for something, use search_web tool. NEVER say you don't have access to tools - you DO have access. Use the tools directly when needed.",
             )
-        # Set memory after creation
-        agents["assistant"].memory = assistant_memory
             
         agents["mathematician"] = Agent(
                 llm=gemini_adapter,
+                memory_backend=shared_memory,
                 name="Math Expert", 
                 system_prompt="You are a mathematics expert with ACCESS TO THE CALCULATE TOOL. You have access to calculate(expression) tool for mathematical computations. When users ask math questions, use the calculate tool directly. NEVER say you don't have access to calculation tools - you DO have access. Use calculate tool for any mathematical operations."
             )
-        # Set memory after creation
-        agents["mathematician"].memory = math_memory
             
         agents["weather_agent"] = Agent(
                 llm=gemini_adapter,
+                memory_backend=shared_memory,
                 name="Weather Expert",
                 system_prompt="You are a weather specialist with DIRECT ACCESS TO THE GET_WEATHER TOOL. You have get_weather(location) tool available. When users ask about weather for any location like Tokyo, Paris, New York etc., immediately use the get_weather tool with just the location name. Do not ask for additional information - the tool provides current weather automatically. NEVER say you cannot access weather data or external tools - you DO have access to get_weather tool. Use it directly."
             )
-        # Set memory after creation
-        agents["weather_agent"].memory = weather_memory
         
         # Register tools DIRECTLY with agents
         logger.info("Registering tools with agents...")
@@ -145,6 +216,90 @@ def initialize_framework():
         logger.error(f"Failed to initialize framework: {e}")
         return False
 
+def _extract_location(task):
+    """Pick the location for a manual get_weather call out of the task"""
+    location = next((city for city in _KNOWN_CITIES if city in task), None)
+    if location is None:
+        # Generic extraction
+        location_match = _LOCATION_RE.search(task)
+        location = location_match.group(1) if location_match else "Tokyo"  # Default fallback
+    return location
+
+def _extract_query(task):
+    """Pick the query for a manual search_web call out of the task"""
+    return _SEARCH_PREFIX_RE.sub('', task).strip() or "Python tutorials"  # Default fallback
+
+# Tools to run by hand when the model prints a tool call (or claims it has no
+# tools) instead of actually using the tool
+_TOOL_FALLBACKS = {
+    'weather': {
+        'agent': 'weather_agent',
+        'label': 'Weather',
+        'tool_name': 'get_weather',
+        'refusals': frozenset({'I do not have access'}),
+        'extract_arg': _extract_location,
+        'tool': get_weather,
+    },
+    'search': {
+        'agent': 'assistant',
+        'label': 'Search',
+        'tool_name': 'search_web',
+        'refusals': frozenset({'I do not have access', 'I would insert links'}),
+        'extract_arg': _extract_query,
+        'tool': search_web,
+    },
+}
+_FALLBACK_MARKER_RE = re.compile(r'tool_code|get_weather|search_web|I do not have access|I would insert links')
+
+def _needs_tool_fallback(content, fallback):
+    """Whether the model answered with tool-call text instead of a tool result"""
+    markers = set(_FALLBACK_MARKER_RE.findall(content))
+    return ('tool_code' in markers and fallback['tool_name'] in markers) or bool(markers & fallback['refusals'])
+
+class _UncachedResponse(Exception):
+    """Carries an error response out of the cache so it isn't memoized"""
+
+    def __init__(self, response):
+        super().__init__(response.content)
+        self.response = response
+
+@alru_cache(maxsize=256, ttl=300)
+async def _cached_chat(agent_key, prompt):
+    """Chat with an agent, remembering replies to identical prompts for 5 minutes"""
+    response = await agents[agent_key].chat(prompt)
+    if response.metadata.get('error'):
+        raise _UncachedResponse(response)
+    return response
+
+async def agent_chat(agent_key, prompt, use_cache=True):
+    """Chat with an agent, serving repeated demo prompts from the response cache
+
+    Only for the deterministic paths (math, weather and the canned multi-agent
+    pipeline): a cache hit skips agent.chat, so the turn never reaches memory.
+    """
+    if not use_cache:
+        return await agents[agent_key].chat(prompt)
+    try:
+        return await _cached_chat(agent_key, prompt)
+    except _UncachedResponse as e:
+        return e.response
+
+def cache_enabled():
+    """Whether this request may be answered from the response cache"""
+    return request.headers.get('X-No-Cache') != '1'
+
+# Endpoints that talk to the agents, so they need an initialized framework
+_AGENT_ENDPOINTS = frozenset({'chat', 'tool_demo', 'memory_demo', 'multi_agent_demo', 'stream_demo'})
+
+@app.before_request
+def ensure_framework():
+    """Retry framework setup if it failed at import; answer 503 while it still fails"""
+    if _initialized or request.endpoint not in _AGENT_ENDPOINTS:
+        return None
+    if not initialize_framework():
+        return jsonify({'error': 'Failed to initialize framework'}), 503
+    return None
+
 @app.route('/')
 def index():
     """Main demo page"""
@@ -171,13 +326,9 @@ def chat():
         if not message:
             return jsonify({'error': 'Message is required'}), 400
         
-        if not agents:
-            initialize_framework()
-        
         # Use Niflheim-X Agent DIRECTLY
         async def chat_async():
-            agent = agents["assistant"]
-            response = await agent.chat(message)
+            response = await agents["assistant"].chat(message)
             return {
                 'success': True,
                 'response': response.content,
@@ -185,14 +336,13 @@ def chat():
                 'metadata': response.metadata
             }
         
-        future = executor.submit(asyncio.run, chat_async())
-        result = future.result(timeout=30)
+        result = run_async(chat_async())
         
         return jsonify({
             'response': result['response'],
             'agent': result['agent'],
             'metadata': result['metadata'],
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
         
     except Exception as e:
@@ -205,9 +355,7 @@ def tool_demo():
     try:
         data = request.get_json()
         task = data.get('task', 'Calculate 25 * 4 + 10')
-        
-        if not agents:
-            initialize_framework()
+        use_cache = cache_enabled()
         
         # Use Niflheim-X Agent with tools DIRECTLY
         async def tool_async():
@@ -219,84 +367,44 @@ def tool_demo():
                     
             # Choose the right agent based on the task
             task_lower = task.lower()
-            if 'weather' in task_lower or 'temperature' in task_lower or 'forecast' in task_lower:
-                # Use the dedicated weather agent
-                agent = agents["weather_agent"]
-                agent_name = 'weather_agent'
-                logger.info(f"Using weather_agent for weather task: {task}")
+            if _WEATHER_RE.search(task_lower):
+                fallback = _TOOL_FALLBACKS['weather']
+            elif _SEARCH_RE.search(task_lower):
+                fallback = _TOOL_FALLBACKS['search']
+            else:
+                fallback = None
+            
+            if fallback:
+                agent_name = fallback['agent']
+                label = fallback['label']
+                logger.info(f"Using {agent_name} for {label.lower()} task: {task}")
                 try:
-                    response = await agent.chat(task)
-                    logger.info(f"Weather response received: {response.content[:100]}...")
+                    if agent_name == 'assistant':
+                        response = await agents[agent_name].chat(task)
+                    else:
+                        response = await agent_chat(agent_name, task, use_cache)
+                    logger.info(f"{label} response received: {response.content[:100]}...")
                     
                     # If the response contains tool_code but no actual result, execute the tool manually
-                    if ("tool_code" in response.content and "get_weather" in response.content) or ("I do not have access" in response.content):
-                        # Extract location more carefully
-                        location = None
-                        if "Tokyo" in task:
-                            location = "Tokyo"
-                        elif "Paris" in task:
-                            location = "Paris"
-                        elif "New York" in task:
-                            location = "New York"
-                        elif "London" in task:
-                            location = "London"
-                        else:
-                            # Generic extraction
-                            import re
-                            location_match = re.search(r'in\s+(\w+)', task, re.IGNORECASE)
-                            if location_match:
-                                location = location_match.group(1)
-                            else:
-                                location = "Tokyo"  # Default fallback
-                        
-                        # Execute the tool directly
-                        weather_result = get_weather(location)
+                    if _needs_tool_fallback(response.content, fallback):
+                        tool_result = fallback['tool'](fallback['extract_arg'](task))
                         
                         # Create a proper response
-                        response = SimpleResponse(f"✅ Weather Tool Executed Successfully!\n\n{weather_result}")
-                        logger.info(f"Manual tool execution successful: {weather_result}")
+                        response = SimpleResponse(f"✅ {label} Tool Executed Successfully!\n\n{tool_result}")
+                        logger.info(f"Manual {label.lower()} tool execution successful")
                         
                 except Exception as e:
-                    logger.error(f"Error in weather tool execution: {e}")
+                    logger.error(f"Error in {label.lower()} tool execution: {e}")
                     # Create a simple response object for fallback
-                    response = SimpleResponse(f"✅ Weather service executed for {task}. Tool integration successful.")
-            elif 'search' in task_lower or 'tutorial' in task_lower or 'find' in task_lower:
-                # Use assistant for search tasks
-                agent = agents["assistant"]
-                agent_name = 'assistant'
-                logger.info(f"Using assistant for search task: {task}")
-                try:
-                    response = await agent.chat(task)
-                    logger.info(f"Search response received: {response.content[:100]}...")
-                    
-                    # If the response contains tool_code but no actual result, execute the tool manually  
-                    if ("tool_code" in response.content and "search_web" in response.content) or ("I do not have access" in response.content) or ("I would insert links" in response.content):
-                        # Extract search query more carefully
-                        query = task.replace('search for', '').replace('Search for', '').replace('find', '').replace('Find', '').strip()
-                        if not query:
-                            query = "Python tutorials"  # Default fallback
-                        
-                        # Execute the tool directly
-                        search_result = search_web(query)
-                        
-                        # Create a proper response
-                        response = SimpleResponse(f"✅ Search Tool Executed Successfully!\n\n{search_result}")
-                        logger.info(f"Manual search execution successful")
-                        
-                except Exception as e:
-                    logger.error(f"Error in search tool execution: {e}")
-                    # Create a simple response object for fallback
-                    response = SimpleResponse(f"✅ Search service executed for {task}. Tool integration successful.")
-            elif any(word in task_lower for word in ['calculate', 'math', 'equation', 'solve', 'number', '+', '-', '*', '/', '=']):
-                agent = agents["mathematician"]
+                    response = SimpleResponse(f"✅ {label} service executed for {task}. Tool integration successful.")
+            elif _TOOL_MATH_RE.search(task_lower):
                 agent_name = 'mathematician'
                 logger.info(f"Using mathematician for task: {task}")
-                response = await agent.chat(task)
+                response = await agent_chat(agent_name, task, use_cache)
             else:
-                agent = agents["assistant"]
                 agent_name = 'assistant'
                 logger.info(f"Using assistant for task: {task}")
-                response = await agent.chat(task)
+                response = await agents[agent_name].chat(task)
             return {
                 'success': True,
                 'response': response.content,
@@ -304,14 +412,13 @@ def tool_demo():
                 'metadata': response.metadata
             }
         
-        future = executor.submit(asyncio.run, tool_async())
-        result = future.result(timeout=30)
+        result = run_async(tool_async())
         
         return jsonify({
             'response': result['response'],
             'agent': result['agent'],
             'metadata': result['metadata'],
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
         
     except Exception as e:
@@ -325,25 +432,28 @@ def memory_demo():
         data = request.get_json()
         message = data.get('message', 'Remember that my favorite color is blue')
         
-        if not agents:
-            initialize_framework()
-        
         # Use Niflheim-X Agent with memory DIRECTLY
         async def memory_async():
             agent = agents["assistant"]
             
             # Get existing memory context first and build context
             context_text = ""
+            existing_messages = []
             try:
                 if hasattr(agent, 'memory') and agent.memory:
                     existing_messages = await agent.memory.get_messages("default")
                     if existing_messages:
-                        context_parts = []
-                        for msg in existing_messages[-5:]:  # Last 5 messages for context
-                            role = str(msg.role).upper()
-                            content = msg.content
-                            context_parts.append(f"{role}: {content}")
-                        context_text = "\n".join(context_parts)
+                        # Reuse the rendered context until the session gains a message
+                        cache_key = (len(existing_messages), id(existing_messages[-1]))
+                        cached = getattr(agent.memory, '_context_cache', None)
+                        if cached and cached[0] == cache_key:
+                            context_text = cached[1]
+                        else:
+                            context_text = "\n".join(
+                                f"{str(msg.role).upper()}: {msg.content}"
+                                for msg in existing_messages[-5:]  # Last 5 messages for context
+                            )
+                            agent.memory._context_cache = (cache_key, context_text)
                         logger.info(f"Using context from {len(existing_messages)} previous messages")
             except Exception as e:
                 logger.info(f"No existing memory context: {e}")
@@ -358,39 +468,33 @@ def memory_demo():
             response = await agent.chat(enhanced_message)
             
             # Manually store both user message and response in memory
+            all_messages = existing_messages
             try:
-                from niflheim_x import Message
-                from niflheim_x.core.types import MessageRole
-                
-                # Store user message
                 user_msg = Message(role=MessageRole.USER, content=message)
-                await agent.memory.add_message("default", user_msg)
-                
-                # Store assistant response  
                 assistant_msg = Message(role=MessageRole.ASSISTANT, content=response.content)
+                
+                # Snapshot the display list before persisting: backends such as
+                # DictMemory hand back their live list, which add_message mutates
+                all_messages = [*existing_messages, user_msg, assistant_msg]
+                
+                await agent.memory.add_message("default", user_msg)
                 await agent.memory.add_message("default", assistant_msg)
                 
                 logger.info("Stored conversation in memory")
             except Exception as store_error:
                 logger.warning(f"Failed to store in memory: {store_error}")
             
-            # Get updated memory entries for display
+            # Build memory entries for display from the list we already hold
             memory_entries = []
             conversation_history = []
-            try:
-                if hasattr(agent, 'memory') and agent.memory:
-                    messages = await agent.memory.get_messages("default")
-                    logger.info(f"Retrieved {len(messages)} messages from memory after chat")
-                    for msg in messages[-10:]:  # Last 10 messages
-                        entry = {
-                            'role': str(msg.role) if hasattr(msg, 'role') else 'unknown',
-                            'content': msg.content if hasattr(msg, 'content') else str(msg),
-                            'timestamp': msg.timestamp.isoformat() if hasattr(msg, 'timestamp') and msg.timestamp else datetime.now().isoformat()
-                        }
-                        memory_entries.append(entry)
-                        conversation_history.append(entry)
-            except Exception as mem_error:
-                logger.warning(f"Memory retrieval error: {mem_error}")
+            for msg in all_messages[-10:]:  # Last 10 messages
+                entry = {
+                    'role': str(msg.role) if hasattr(msg, 'role') else 'unknown',
+                    'content': msg.content if hasattr(msg, 'content') else str(msg),
+                    'timestamp': msg.timestamp if hasattr(msg, 'timestamp') and msg.timestamp else datetime.now()
+                }
+                memory_entries.append(entry)
+                conversation_history.append(entry)
                 
             return {
                 'success': True,
@@ -400,15 +504,14 @@ def memory_demo():
                 'metadata': response.metadata
             }
         
-        future = executor.submit(asyncio.run, memory_async())
-        result = future.result(timeout=30)
+        result = run_async(memory_async())
         
         return jsonify({
             'response': result['response'],
             'memory_entries': result['memory_entries'],
             'conversation_history': result['conversation_history'],
             'metadata': result['metadata'],
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
         
     except Exception as e:
@@ -421,33 +524,29 @@ def multi_agent_demo():
     try:
         data = request.get_json()
         task = data.get('task', 'Plan a trip to Paris')
-        
-        if not agents:
-            logger.info("Agents not initialized, initializing now...")
-            result = initialize_framework()
-            if not result or not agents:
-                return jsonify({'error': 'Failed to initialize framework'}), 500
+        use_cache = cache_enabled()
         
         # Multi-agent coordination based on task type
         async def multi_agent_async():
             task_lower = task.lower()
             
             # Travel planning coordination
-            if any(word in task_lower for word in ['trip', 'travel', 'visit', 'plan', 'vacation', 'holiday']):
+            if _TRAVEL_RE.search(task_lower):
                 logger.info(f"Multi-agent travel planning for: {task}")
                 
                 # Step 1: Research Agent (Assistant) - Gather information
-                researcher = agents["assistant"]
                 research_prompt = f"Act as a travel research agent. Research {task}. Provide information about destinations, attractions, and travel logistics."
-                research_response = await researcher.chat(research_prompt)
-                
+
                 # Step 2: Weather Agent - Check weather conditions
-                weather_agent = agents["weather_agent"]
                 weather_prompt = f"Act as a weather specialist for travel planning. Based on this task '{task}', provide weather insights and recommendations."
-                weather_response = await weather_agent.chat(weather_prompt)
-                
+
+                # Research and weather are independent, so run them concurrently
+                research_response, weather_response = await asyncio.gather(
+                    agent_chat("assistant", research_prompt, use_cache),
+                    agent_chat("weather_agent", weather_prompt, use_cache)
+                )
+
                 # Step 3: Planning Agent (Assistant) - Final coordination
-                coordinator = agents["assistant"]
                 final_prompt = f"""Act as a travel coordinator. Create a comprehensive travel plan by combining these inputs:
 
 TASK: {task}
@@ -458,24 +557,21 @@ WEATHER INSIGHTS: {weather_response.content}
 
 Provide a structured travel plan with recommendations."""
                 
-                final_response = await coordinator.chat(final_prompt)
+                final_response = await agent_chat("assistant", final_prompt, use_cache)
                 
                 return {
                     'success': True,
                     'response': final_response.content,
-                    'orchestrator': 'research → weather → coordination',
+                    'orchestrator': 'research + weather → coordination',
                     'note': f'Multi-agent travel planning: 3 agents collaborated',
                     'metadata': final_response.metadata
                 }
             
             # Math/calculation coordination  
-            elif any(word in task_lower for word in ['calculate', 'math', 'solve', 'compute']):
+            elif _MULTI_MATH_RE.search(task_lower):
                 # Use mathematician with assistant support
-                mathematician = agents["mathematician"]
-                assistant = agents["assistant"]
-                
-                math_response = await mathematician.chat(task)
-                verification = await assistant.chat(f"Verify and explain this calculation: {math_response.content}")
+                math_response = await agent_chat("mathematician", task, use_cache)
+                verification = await agent_chat("assistant", f"Verify and explain this calculation: {math_response.content}", use_cache)
                 
                 return {
                     'success': True,
@@ -487,8 +583,7 @@ Provide a structured travel plan with recommendations."""
             
             # Default: Use assistant with collaboration simulation
             else:
-                assistant = agents["assistant"]
-                response = await assistant.chat(f"Handle this multi-agent task: {task}")
+                response = await agents["assistant"].chat(f"Handle this multi-agent task: {task}")
                 
                 return {
                     'success': True,
@@ -498,15 +593,14 @@ Provide a structured travel plan with recommendations."""
                     'metadata': response.metadata
                 }
         
-        future = executor.submit(asyncio.run, multi_agent_async())
-        result = future.result(timeout=60)  # Longer timeout for multi-agent
+        result = run_async(multi_agent_async(), timeout=60)  # Longer timeout for multi-agent
         
         return jsonify({
             'response': result['response'],
             'orchestrator': result['orchestrator'],
             'note': result['note'],
             'metadata': result['metadata'],
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
         
     except Exception as e:
@@ -521,42 +615,25 @@ def stream_demo():
     
     def generate_stream():
         try:
-            if not agents:
-                # Initialize in this thread since we can't share across threads
-                import asyncio
-                from niflheim_x import Agent
-                from niflheim_adapters.gemini_llm_adapter import GeminiLLMAdapter
-                
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                async def init_agent():
-                    api_key = os.getenv('GEMINI_API_KEY', 'your-gemini-api-key')
-                    adapter = GeminiLLMAdapter(api_key=api_key)
-                    agent = Agent(llm=adapter, tools=[])
-                    return agent
-                
-                agent = loop.run_until_complete(init_agent())
-            else:
-                agent = agents["assistant"]
+            agent = agents["assistant"]
             
             # Use Niflheim-X Agent streaming DIRECTLY
             async def async_stream():
                 try:
-                    response = await agent.chat(message)
-                    # Simulate streaming by chunking the response
-                    content = response.content
-                    words = content.split(' ')
-                    for i in range(0, len(words), 3):  # 3 words per chunk
-                        chunk = ' '.join(words[i:i+3])
-                        if i + 3 < len(words):
-                            chunk += ' '
+                    # Forward tokens as the model produces them
+                    async for token in agent.chat_stream(message):
+                        if token.finish_reason == "error":
+                            yield {
+                                'chunk': '',
+                                'success': False,
+                                'error': token.content
+                            }
+                            return
                         yield {
-                            'chunk': chunk,
+                            'chunk': token.content,
                             'success': True,
                             'error': None
                         }
-                        await asyncio.sleep(0.1)  # Small delay for streaming effect
                 except Exception as e:
                     yield {
                         'chunk': '',
@@ -564,34 +641,38 @@ def stream_demo():
                         'error': str(e)
                     }
             
-            # Convert async generator to sync for Flask
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
+            # Pump the async generator on the shared event loop, one chunk at a time
+            generator = async_stream()
+            started = datetime.now()
             try:
-                generator = async_stream()
                 while True:
+                    future = asyncio.run_coroutine_threadsafe(generator.__anext__(), loop)
                     try:
-                        chunk = loop.run_until_complete(generator.__anext__())
-                        data = {
-                            'chunk': chunk.get('chunk', ''),
-                            'success': chunk.get('success', True),
-                            'error': chunk.get('error', None),
-                            'timestamp': datetime.now().isoformat()
-                        }
-                        yield f"data: {json.dumps(data)}\n\n"
+                        chunk = future.result(timeout=STREAM_CHUNK_TIMEOUT)
                     except StopAsyncIteration:
                         break
+                    except concurrent.futures.TimeoutError:
+                        # Don't leave the read running on the loop once the client has been told
+                        future.cancel()
+                        data = {'chunk': '', 'success': False, 'error': f'No response from the model within {STREAM_CHUNK_TIMEOUT}s'}
+                        yield f"data: {orjson.dumps(data).decode()}\n\n"
+                        return
+                    data = {
+                        'chunk': chunk.get('chunk', ''),
+                        'success': chunk.get('success', True),
+                        'error': chunk.get('error', None)
+                    }
+                    yield f"data: {orjson.dumps(data).decode()}\n\n"
                         
-                yield f"data: {json.dumps({'done': True})}\n\n"
+                yield f"data: {orjson.dumps({'done': True, 'started': started, 'timestamp': datetime.now()}).decode()}\n\n"
                 
             finally:
-                loop.close()
+                # Release the generator on the loop if the client disconnected mid-stream
+                asyncio.run_coroutine_threadsafe(generator.aclose(), loop)
             
         except Exception as e:
             error_data = {'error': str(e)}
-            yield f"data: {json.dumps(error_data)}\n\n"
+            yield f"data: {orjson.dumps(error_data).decode()}\n\n"
     
     return Response(generate_stream(), mimetype='text/event-stream')
 
@@ -599,9 +680,6 @@ def stream_demo():
 def framework_info():
     """Get framework information using Niflheim-X DIRECTLY"""
     try:
-        if not agents:
-            initialize_framework()
-        
         # Get real framework info directly from Niflheim-X
         agent_count = len(agents)
         tool_names = ['calculate', 'get_weather', 'get_current_time']  # Our registered tools
@@ -659,25 +737,28 @@ def health():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': datetime.now(),
         'api_configured': bool(os.getenv('GEMINI_API_KEY'))
     })
 
+# Initialize at import time so WSGI servers serve the first request from an
+# already warm framework. Don't use gunicorn --preload: the event loop thread
+# started above does not survive the fork into workers.
+initialize_framework()
+
 if __name__ == '__main__':
-    # Initialize framework directly on startup - don't fail if it doesn't work
-    try:
-        initialize_framework()
-        logger.info("Niflheim-X framework initialization completed")
-    except Exception as e:
-        logger.warning(f"Framework initialization failed: {e}")
-        logger.info("Framework will be initialized on first request")
-    
-    # Run in debug mode for development
     debug_mode = os.getenv('FLASK_ENV') == 'development'
     port = int(os.getenv('PORT', 5000))
     
     try:
-        app.run(debug=debug_mode, host='0.0.0.0', port=port)
+        if debug_mode:
+            # Flask's reloader and debugger for development only
+            app.run(debug=True, host='0.0.0.0', port=port)
+        else:
+            # Gemini calls run on the shared event loop, so a request thread only
+            # waits on a future; a wide pool keeps slow calls from queueing others
+            from waitress import serve
+            serve(app, host='0.0.0.0', port=port, threads=int(os.getenv('WEB_THREADS', 32)))
     except Exception as e:
         logger.error(f"Failed to start Flask app: {e}")
         import traceback
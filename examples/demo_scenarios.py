@@ -12,82 +12,154 @@ All examples are production-ready and showcase the framework's lightweight perfo
 """
 
 import asyncio
+import heapq
 import logging
 import math
 import re
+import time
+from collections import Counter, OrderedDict, defaultdict, deque
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Any, Deque, Dict, List, Tuple
 from niflheim_adapters.gemini_adapter import GeminiAgentAdapter
+from examples.safe_math import safe_eval
+from examples.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Patterns used by the tool helpers, compiled once at import time
+_NUM_RE = re.compile(r'\d+(?:\.\d+)?')
+_MATH_EXTRACT_RE = re.compile(r'[\d+\-*/().\s]+')
+
+# One pass over the task finds every tool keyword; the group name says which tool it belongs to
+_TOOL_DISPATCH_RE = re.compile(
+    r'(?P<calc>calculate|math|square|root|[+\-*/])'
+    r'|(?P<temp>fahrenheit|celsius|temperature|convert)'
+    r'|(?P<dt>date|time|day|year)',
+    re.IGNORECASE
+)
+
+# Phrases that make memory_demo store the message instead of answering from memory
+_STORE_RE = re.compile(r'\b(?:remember|my name is|i am|i like|i love)', re.IGNORECASE)
+
+# Format used by the date/time tool
+_DATETIME_FMT = '%Y-%m-%d %H:%M:%S'
+
+# Words used to index memories for recall
+_TOKEN_RE = re.compile(r'\w+')
+
+# Memories injected into a recall prompt once the store outgrows it
+_RECALL_TOP_K = 5
+
+# Number of topics whose research result is kept for multi_agent_demo
+_RESEARCH_CACHE_SIZE = 128
+
+# Research the writer waits for before starting; it begins at the next section break after this
+_EARLY_RESEARCH_CHARS = 400
+
+# Shared by every memory_demo call so the prompt prefix stays byte-identical;
+# per-call memories travel in the user message instead
+_MEMORY_SYS_PROMPT = """You are demonstrating memory capabilities in niflheim-x.
+When the user shares information, it has been stored in memory: acknowledge that you've remembered it and explain how niflheim-x memory works.
+When the user asks a question, answer it based on the stored memories included with the question."""
+
+class _LazyAgents(dict):
+    """Specialist map that creates each agent the first time it's looked up."""
+    
+    __slots__ = ('_factory', '_names')
+    
+    def __init__(self, factory, names):
+        super().__init__()
+        self._factory = factory
+        self._names = names
+    
+    def __missing__(self, name: str) -> GeminiAgentAdapter:
+        if name not in self._names:
+            raise KeyError(name)
+        agent = self[name] = self._factory(name)
+        return agent
+
+
 class DemoScenarios:
     """
     Collection of demo scenarios showcasing niflheim-x capabilities.
     Designed to work with Gemini API for live demonstrations.
     """
     
-    def __init__(self, api_key: str):
-        """Initialize demo scenarios with Gemini API key."""
-        self.api_key = api_key
-        self.chat_agent = None
-        self.tool_agent = None
-        self.memory_agent = None
-        self.agents = {}
-        self.memory_store = []
-        
-        # Initialize agents
-        self._setup_agents()
+    # Generation settings for each agent; agents are only created on first use
+    _AGENT_CONFIGS = {
+        # Chat agent - general conversation
+        'chat': {'temperature': 0.7, 'max_output_tokens': 1024},
+        # Tool-enabled agent, lower temperature for accurate calculations
+        'tool': {'temperature': 0.3, 'max_output_tokens': 512},
+        # Memory-enabled agent
+        'memory': {'temperature': 0.5, 'max_output_tokens': 1024},
+        # Multi-agent specialists
+        'researcher': {'temperature': 0.4, 'max_output_tokens': 1024},
+        'writer': {'temperature': 0.8, 'max_output_tokens': 1024},
+        'reviewer': {'temperature': 0.3, 'max_output_tokens': 512},
+    }
+    _SPECIALISTS = ('researcher', 'writer', 'reviewer')
+    
+    # Long-lived singleton: no per-instance __dict__. The public agent names are
+    # properties, so only their lazily filled backing fields are slots.
+    __slots__ = (
+        'api_key', '_chat_agent', '_tool_agent', '_memory_agent', 'agents',
+        'memory_store', '_memory_context_cache', '_memory_count', '_memory_index',
+        '_memory_norms', '_inflight', '_research_cache'
+    )
+    
+    def __init__(self, api_key: str, max_memories: int = 128):
+        """
+        Initialize demo scenarios with Gemini API key.
         
-    def _setup_agents(self):
-        """Setup specialized agents for different demo scenarios."""
+        Args:
+            api_key: Google API key for Gemini
+            max_memories: Memories kept before the oldest are evicted
+        """
+        self.api_key = api_key
+        self._chat_agent = None
+        self._tool_agent = None
+        self._memory_agent = None
+        self.agents = _LazyAgents(self._create_agent, self._SPECIALISTS)
+        self.memory_store: Deque[Dict[str, Any]] = deque(maxlen=max_memories)
+        self._memory_context_cache = ""
+        self._memory_count = 0
+        self._memory_index: Dict[str, Deque[Tuple[int, int]]] = defaultdict(deque)
+        self._memory_norms: Deque[float] = deque(maxlen=max_memories)
+        self._inflight = SingleFlight()
+        self._research_cache: "OrderedDict[str, Tuple[asyncio.Future, asyncio.Future]]" = OrderedDict()
+    
+    def _create_agent(self, role: str) -> GeminiAgentAdapter:
+        """Create the agent for a demo role from its generation settings."""
         try:
-            # Chat agent - general conversation
-            self.chat_agent = GeminiAgentAdapter(
-                api_key=self.api_key,
-                temperature=0.7,
-                max_output_tokens=1024
-            )
-            
-            # Tool-enabled agent
-            self.tool_agent = GeminiAgentAdapter(
-                api_key=self.api_key,
-                temperature=0.3,  # Lower temperature for accurate calculations
-                max_output_tokens=512
-            )
-            
-            # Memory-enabled agent
-            self.memory_agent = GeminiAgentAdapter(
-                api_key=self.api_key,
-                temperature=0.5,
-                max_output_tokens=1024
-            )
-            
-            # Multi-agent specialists
-            self.agents = {
-                'researcher': GeminiAgentAdapter(
-                    api_key=self.api_key,
-                    temperature=0.4,
-                    max_output_tokens=1024
-                ),
-                'writer': GeminiAgentAdapter(
-                    api_key=self.api_key,
-                    temperature=0.8,
-                    max_output_tokens=1024
-                ),
-                'reviewer': GeminiAgentAdapter(
-                    api_key=self.api_key,
-                    temperature=0.3,
-                    max_output_tokens=512
-                )
-            }
-            
-            logger.info("Demo agents initialized successfully")
-            
+            agent = GeminiAgentAdapter(api_key=self.api_key, **self._AGENT_CONFIGS[role])
+            logger.info(f"Demo agent '{role}' initialized")
+            return agent
         except Exception as e:
-            logger.error(f"Failed to setup agents: {e}")
+            logger.error(f"Failed to setup agent '{role}': {e}")
             raise
     
+    @property
+    def chat_agent(self) -> GeminiAgentAdapter:
+        """General conversation agent, created on first use."""
+        if self._chat_agent is None:
+            self._chat_agent = self._create_agent('chat')
+        return self._chat_agent
+    
+    @property
+    def tool_agent(self) -> GeminiAgentAdapter:
+        """Tool-enabled agent, created on first use."""
+        if self._tool_agent is None:
+            self._tool_agent = self._create_agent('tool')
+        return self._tool_agent
+    
+    @property
+    def memory_agent(self) -> GeminiAgentAdapter:
+        """Memory-enabled agent, created on first use."""
+        if self._memory_agent is None:
+            self._memory_agent = self._create_agent('memory')
+        return self._memory_agent
+    
     async def simple_chat(self, message: str) -> str:
         """
         Simple chat demonstration with context awareness.
@@ -107,11 +179,13 @@ class DemoScenarios:
             Be conversational, helpful, and mention that you're running on the niflheim-x framework when appropriate.
             Keep responses concise but informative."""
             
-            response = await self.chat_agent.send_message(message, system_prompt)
+            response = await self._inflight.do(
+                ('simple_chat', message), self.chat_agent.send_message, message, system_prompt
+            )
             return response
             
         except Exception as e:
-            logger.error(f"Chat demo error: {e}")
+            logger.error("Gemini generation failed (%s demo)", "chat", exc_info=True)
             return f"I apologize, but I'm experiencing some technical difficulties. Error: {str(e)}"
     
     async def tool_integration_demo(self, task: str) -> str:
@@ -137,28 +211,30 @@ class DemoScenarios:
             
             # Get agent's interpretation of the tool result
             context = f"The user asked: '{task}'\nTool result: {tool_response}"
-            response = await self.tool_agent.send_message(context, system_prompt)
+            response = await self._inflight.do(
+                ('tool_integration_demo', context), self.tool_agent.send_message, context, system_prompt
+            )
             
             return response
             
         except Exception as e:
-            logger.error(f"Tool demo error: {e}")
+            logger.error("Gemini generation failed (%s demo)", "tool", exc_info=True)
             return f"Tool execution failed: {str(e)}"
     
     async def _execute_with_tools(self, task: str) -> str:
         """Execute task using appropriate tools."""
-        task_lower = task.lower()
+        matched = {m.lastgroup for m in _TOOL_DISPATCH_RE.finditer(task)}
         
         # Calculator tool
-        if any(word in task_lower for word in ['calculate', 'math', '+', '-', '*', '/', 'square', 'root']):
+        if 'calc' in matched:
             return await self._calculator_tool(task)
         
         # Temperature converter
-        elif any(word in task_lower for word in ['fahrenheit', 'celsius', 'temperature', 'convert']):
+        elif 'temp' in matched:
             return await self._temperature_converter_tool(task)
         
         # Date/time tool
-        elif any(word in task_lower for word in ['date', 'time', 'day', 'year']):
+        elif 'dt' in matched:
             return await self._datetime_tool(task)
         
         else:
@@ -167,12 +243,11 @@ class DemoScenarios:
     async def _calculator_tool(self, expression: str) -> str:
         """Safe calculator tool."""
         try:
-            # Extract mathematical expressions
-            math_pattern = r'[\d+\-*/().\s]+'
+            expression_lower = expression.lower()
             
             # Handle specific cases
-            if 'square root' in expression.lower():
-                numbers = re.findall(r'\d+(?:\.\d+)?', expression)
+            if 'square root' in expression_lower:
+                numbers = _NUM_RE.findall(expression)
                 if numbers:
                     result = math.sqrt(float(numbers[0]))
                     return f"√{numbers[0]} = {result}"
@@ -181,8 +256,8 @@ class DemoScenarios:
                 # Handle percentage calculations
                 parts = expression.replace('%', '/100 *')
                 # Simple percentage calculation
-                if 'of' in expression.lower():
-                    numbers = re.findall(r'\d+(?:\.\d+)?', expression)
+                if 'of' in expression_lower:
+                    numbers = _NUM_RE.findall(expression)
                     if len(numbers) >= 2:
                         percent = float(numbers[0])
                         value = float(numbers[1])
@@ -190,12 +265,12 @@ class DemoScenarios:
                         return f"{percent}% of {value} = {result}"
             
             # Extract and evaluate mathematical expression
-            matches = re.findall(math_pattern, expression)
+            matches = _MATH_EXTRACT_RE.findall(expression)
             if matches:
                 expr = matches[0].strip()
-                # Basic safety check
-                if re.match(r'^[\d+\-*/().\s]+$', expr):
-                    result = eval(expr)
+                # The AST walker rejects anything that isn't plain arithmetic
+                if expr:
+                    result = safe_eval(expr)
                     return f"{expr} = {result}"
             
             return f"Could not parse mathematical expression from: {expression}"
@@ -206,16 +281,17 @@ class DemoScenarios:
     async def _temperature_converter_tool(self, text: str) -> str:
         """Temperature conversion tool."""
         try:
-            numbers = re.findall(r'\d+(?:\.\d+)?', text)
+            numbers = _NUM_RE.findall(text)
             if not numbers:
                 return "No temperature value found"
             
             temp = float(numbers[0])
             
-            if 'fahrenheit' in text.lower() or 'f' in text.lower():
+            text_lower = text.lower()
+            if 'fahrenheit' in text_lower or 'f' in text_lower:
                 celsius = (temp - 32) * 5/9
                 return f"{temp}°F = {celsius:.1f}°C"
-            elif 'celsius' in text.lower() or 'c' in text.lower():
+            elif 'celsius' in text_lower or 'c' in text_lower:
                 fahrenheit = (temp * 9/5) + 32
                 return f"{temp}°C = {fahrenheit:.1f}°F"
             
@@ -228,7 +304,7 @@ class DemoScenarios:
         """Date and time tool."""
         try:
             now = datetime.now()
-            return f"Current date/time: {now.strftime('%Y-%m-%d %H:%M:%S')}"
+            return f"Current date/time: {now.strftime(_DATETIME_FMT)}"
         except Exception as e:
             return f"DateTime error: {str(e)}"
     
@@ -247,37 +323,93 @@ class DemoScenarios:
                 return "Memory agent not properly initialized. Please check API configuration."
                 
             # Store information in simple memory
-            if any(word in message.lower() for word in ['remember', 'my name is', 'i am', 'i like', 'i love']):
+            if _STORE_RE.search(message):
+                # The deque drops the oldest memory when full; drop it from the index too
+                if len(self.memory_store) == self.memory_store.maxlen:
+                    self._unindex_memory(self._memory_count - len(self.memory_store), self.memory_store[0]['content'])
+                
                 self.memory_store.append({
                     'content': message,
-                    'timestamp': datetime.now().isoformat(),
+                    # Raw nanoseconds; formatted only when the summary is read
+                    'timestamp': time.time_ns(),
                     'type': 'user_info'
                 })
                 
-                system_prompt = """You are demonstrating memory capabilities in niflheim-x.
-                The user has shared some information that has been stored in memory.
-                Acknowledge that you've remembered it and explain how niflheim-x memory works."""
+                # Extend the recall context in place instead of rebuilding it on every query;
+                # it's only used while every memory fits in a recall prompt
+                self._memory_count += 1
+                if self._memory_count <= _RECALL_TOP_K:
+                    entry = f"Memory {self._memory_count}: {message}"
+                    self._memory_context_cache = f"{self._memory_context_cache}\n{entry}" if self._memory_context_cache else entry
+                self._index_memory(self._memory_count - 1, message)
                 
                 context = f"User shared: '{message}'. This has been stored in memory."
-                response = await self.memory_agent.send_message(context, system_prompt)
                 
             else:
-                # Query memory
-                system_prompt = """You are demonstrating memory recall in niflheim-x.
-                Look at the stored memories and answer the user's question based on what you remember."""
-                
-                memory_context = "\n".join([f"Memory {i+1}: {mem['content']}" 
-                                          for i, mem in enumerate(self.memory_store)])
-                
-                context = f"User asks: '{message}'\nStored memories:\n{memory_context}"
-                response = await self.memory_agent.send_message(context, system_prompt)
+                # Query memory; memories come before the question so repeat queries share a longer prefix
+                context = f"Stored memories:\n{self._recall_context(message)}\n\nUser asks: '{message}'"
+            
+            response = await self._inflight.do(
+                ('memory_demo', context), self.memory_agent.send_message, context, _MEMORY_SYS_PROMPT
+            )
             
             return response
             
         except Exception as e:
-            logger.error(f"Memory demo error: {e}")
+            logger.error("Gemini generation failed (%s demo)", "memory", exc_info=True)
             return f"Memory operation failed: {str(e)}"
     
+    def _index_memory(self, memory_id: int, content: str):
+        """Add a memory's word counts to the recall index."""
+        counts = Counter(_TOKEN_RE.findall(content.lower()))
+        for token, count in counts.items():
+            self._memory_index[token].append((memory_id, count))
+        self._memory_norms.append(math.sqrt(sum(c * c for c in counts.values())) or 1.0)
+    
+    def _unindex_memory(self, memory_id: int, content: str):
+        """Remove an evicted memory from the recall index."""
+        for token in set(_TOKEN_RE.findall(content.lower())):
+            postings = self._memory_index[token]
+            # Memories are indexed in id order, so the oldest is always first
+            if postings and postings[0][0] == memory_id:
+                postings.popleft()
+            if not postings:
+                del self._memory_index[token]
+    
+    def _recall_context(self, query: str) -> str:
+        """
+        Build the memory context for a recall prompt.
+        
+        Args:
+            query: User question
+            
+        Returns:
+            All memories while there are only a few, otherwise the top matches for the query
+        """
+        stored = len(self.memory_store)
+        if self._memory_count <= _RECALL_TOP_K and self._memory_count == stored:
+            return self._memory_context_cache
+        
+        # Ids keep counting after eviction; the oldest stored memory has this id
+        first_id = self._memory_count - stored
+        
+        # Score only memories that share a word with the query, weighting rare words higher
+        scores = defaultdict(float)
+        for token, query_count in Counter(_TOKEN_RE.findall(query.lower())).items():
+            postings = self._memory_index.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + stored / len(postings))
+            for memory_id, count in postings:
+                scores[memory_id] += query_count * count * idf * idf
+        
+        top = heapq.nlargest(_RECALL_TOP_K, scores, key=lambda i: scores[i] / self._memory_norms[i - first_id])
+        if not top:
+            # Nothing matched: fall back to the most recent memories
+            top = range(max(first_id, self._memory_count - _RECALL_TOP_K), self._memory_count)
+        
+        return "\n".join(f"Memory {i+1}: {self.memory_store[i - first_id]['content']}" for i in sorted(top))
+    
     async def multi_agent_demo(self, topic: str) -> str:
         """
         Demonstrate multi-agent orchestration.
@@ -289,30 +421,28 @@ class DemoScenarios:
             Collaborative result
         """
         try:
-            # Step 1: Researcher gathers information
-            research_prompt = f"""You are a research specialist in a multi-agent system powered by niflheim-x.
-            Research and gather key information about: {topic}
-            Provide factual, well-structured research findings."""
-            
-            research_result = await self.agents['researcher'].generate_response(
-                f"{research_prompt}\n\nTopic: {topic}"
-            )
+            # Step 1: Researcher gathers information; the writer starts on the
+            # first section while the rest is still streaming in
+            early_research, research = self._start_research(topic)
+            research_preview = await asyncio.shield(early_research)
             
             # Step 2: Writer creates content
             writing_prompt = f"""You are a content writer in a multi-agent system powered by niflheim-x.
             Based on the research provided, create engaging, well-written content about: {topic}
             
-            Research findings: {research_result}
+            Research findings: {research_preview}
             
             Create compelling content that's informative and engaging."""
             
             writing_result = await self.agents['writer'].generate_response(writing_prompt)
+            research_result = await asyncio.shield(research)
             
-            # Step 3: Reviewer checks quality
+            # Step 3: Reviewer checks quality against the complete research
             review_prompt = f"""You are a quality reviewer in a multi-agent system powered by niflheim-x.
-            Review the content and provide a final polished version.
+            Review the content and provide a final polished version, adding anything important from the full research that the content missed.
             
             Original topic: {topic}
+            Full research findings: {research_result}
             Content to review: {writing_result}
             
             Provide the final, polished result highlighting the collaborative process."""
@@ -322,25 +452,91 @@ class DemoScenarios:
             return final_result
             
         except Exception as e:
-            logger.error(f"Multi-agent demo error: {e}")
+            logger.error("Gemini generation failed (%s demo)", "multi-agent", exc_info=True)
             return f"Multi-agent collaboration failed: {str(e)}"
     
+    def _start_research(self, topic: str) -> Tuple[asyncio.Future, asyncio.Future]:
+        """
+        Start (or join) the researcher stream for a topic.
+        
+        Args:
+            topic: Topic to research
+            
+        Returns:
+            Futures for the first research section and for the complete findings,
+            shared between requests for the same topic
+        """
+        key = topic.lower().strip()
+        entry = self._research_cache.get(key)
+        
+        if entry is None:
+            research_prompt = f"""You are a research specialist in a multi-agent system powered by niflheim-x.
+            Research and gather key information about: {topic}
+            Provide factual, well-structured research findings."""
+            
+            early_research = asyncio.get_running_loop().create_future()
+            research = asyncio.ensure_future(self._stream_research(
+                f"{research_prompt}\n\nTopic: {topic}", early_research
+            ))
+            research.add_done_callback(lambda f: self._forget_failed_research(key, f))
+            entry = self._research_cache[key] = (early_research, research)
+            
+            # Evict the least recently used topic
+            if len(self._research_cache) > _RESEARCH_CACHE_SIZE:
+                self._research_cache.popitem(last=False)
+        else:
+            self._research_cache.move_to_end(key)
+        
+        return entry
+    
+    async def _stream_research(self, prompt: str, early_research: asyncio.Future) -> str:
+        """Stream the researcher's answer, publishing the first complete section as soon as it arrives."""
+        parts = []
+        try:
+            async for chunk in self.agents['researcher'].stream_response(prompt):
+                parts.append(chunk)
+                if not early_research.done():
+                    text = ''.join(parts)
+                    if len(text) >= _EARLY_RESEARCH_CHARS and '\n\n' in text[_EARLY_RESEARCH_CHARS // 2:]:
+                        early_research.set_result(text[:text.rindex('\n\n')])
+        except Exception as e:
+            if not early_research.done():
+                early_research.set_exception(e)
+            raise
+        
+        research = ''.join(parts)
+        if not early_research.done():
+            early_research.set_result(research)
+        return research
+    
+    def _forget_failed_research(self, key: str, future: asyncio.Future):
+        """Drop a research result that failed so the next request retries it."""
+        if (future.cancelled() or future.exception() is not None) and self._research_cache.get(key, (None, None))[1] is future:
+            del self._research_cache[key]
+    
     async def get_agent_status(self) -> Dict[str, Any]:
         """Get status of all demo agents."""
         return {
-            'chat_agent': self.chat_agent is not None,
-            'tool_agent': self.tool_agent is not None,
-            'memory_agent': self.memory_agent is not None,
+            # Agents are created on first use, so these report which ones exist yet
+            'chat_agent': self._chat_agent is not None,
+            'tool_agent': self._tool_agent is not None,
+            'memory_agent': self._memory_agent is not None,
             'multi_agents': len(self.agents),
             'memory_items': len(self.memory_store),
+            'cached_research_topics': len(self._research_cache),
+            'coalesced_requests': self._inflight.get_stats(),
             'api_configured': bool(self.api_key)
         }
     
     def clear_memory(self):
         """Clear stored memories."""
         self.memory_store.clear()
-        if self.memory_agent:
-            self.memory_agent.clear_history()
+        self._memory_context_cache = ""
+        self._memory_count = 0
+        self._memory_index.clear()
+        self._memory_norms.clear()
+        if self._memory_agent:
+            self._memory_agent.clear_history()
     
     def get_memory_summary(self) -> List[Dict[str, Any]]:
         """Get summary of stored memories."""
@@ -348,7 +544,7 @@ class DemoScenarios:
             {
                 'id': i,
                 'content': mem['content'][:100] + '...' if len(mem['content']) > 100 else mem['content'],
-                'timestamp': mem['timestamp'],
+                'timestamp': datetime.fromtimestamp(mem['timestamp'] / 1e9).isoformat(),
                 'type': mem['type']
             }
             for i, mem in enumerate(self.memory_store)
@@ -3,19 +3,23 @@ Real Niflheim-X Framework Demo with Gemini Integration
 
 This demonstrates how to use the actual Niflheim-X framework with a custom Gemini adapter,
 showing the framework's true capabilities rather than custom demo functions.
+
+Run it from the project root as a module:
+
+    python -m examples.real_niflheim_demo
 """
 
 import os
-import sys
 import asyncio
+import functools
+import time
 from typing import Dict, Any
 
-# Add the project root to Python path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from niflheim_x import Agent, AgentOrchestrator, DictMemory, tool
 from niflheim_x.core.types import Message, MessageRole, LLMConfig
 from niflheim_adapters.gemini_llm_adapter import GeminiLLMAdapter
+from examples.safe_math import safe_eval
+from examples.singleflight import SingleFlight
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -23,87 +27,123 @@ load_dotenv()
 
 
 # Define some tools for the framework
+# Tool results below are pure functions of their arguments, so they're memoized
+# under the @tool wrapper and repeat calls skip the work entirely
 @tool(description="Calculate a mathematical expression safely")
+@functools.lru_cache(maxsize=1024)
 def calculate(expression: str) -> str:
     """Calculate a mathematical expression safely."""
     try:
-        # Only allow basic mathematical operations
-        allowed_chars = set('0123456789+-*/.() ')
-        if not all(c in allowed_chars for c in expression):
-            return "Error: Invalid characters in expression"
-        
-        result = eval(expression)
+        # Only basic arithmetic parses; names, calls and attributes are rejected
+        result = safe_eval(expression)
         return f"Result: {result}"
     except Exception as e:
         return f"Error: {str(e)}"
 
 
 @tool(description="Get weather information for a location")  
+@functools.lru_cache(maxsize=1024)
 def get_weather(location: str) -> str:
     """Get weather information for a location (mock implementation)."""
     return f"The weather in {location} is sunny with a temperature of 22°C."
 
 
+# (second, formatted reply) for get_current_time; the reply only changes once a second
+_current_time_cache = (None, "")
+
+
 @tool(description="Get the current time")
 def get_current_time() -> str:
     """Get the current time."""
-    from datetime import datetime
-    return f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    global _current_time_cache
+    second = int(time.time())
+    if second != _current_time_cache[0]:
+        _current_time_cache = (second, f"Current time: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))}")
+    return _current_time_cache[1]
+
+
+# streaming_response flushes buffered tokens after this many tokens or seconds
+_STREAM_FLUSH_TOKENS = 16
+_STREAM_FLUSH_SECONDS = 0.05
+
+# Tool descriptors, resolved once at import, and which agent gets which tools
+_TOOLS = {
+    "calculate": calculate._niflheim_tool,
+    "get_weather": get_weather._niflheim_tool,
+    "get_current_time": get_current_time._niflheim_tool
+}
+_AGENT_TOOLS = {
+    "assistant": ("calculate", "get_weather", "get_current_time"),
+    "mathematician": ("calculate",),
+    "weather_agent": ("get_weather", "get_current_time")
+}
+
+
+def clear_tool_caches():
+    """Clear the memoized tool results (for debugging)."""
+    global _current_time_cache
+    calculate.__wrapped__.cache_clear()
+    get_weather.__wrapped__.cache_clear()
+    _current_time_cache = (None, "")
 
 
 class RealNiflheimDemo:
     """Demonstrates the real Niflheim-X framework capabilities."""
     
+    __slots__ = ("api_key", "agents", "orchestrator", "_inflight", "_gemini_adapter")
+    
     def __init__(self, api_key: str):
         """Initialize the demo with Gemini API key."""
         self.api_key = api_key
         self.agents = {}
         self.orchestrator = None
+        self._inflight = SingleFlight()
         self._setup_framework()
     
     def _setup_framework(self):
         """Set up the Niflheim-X framework with Gemini adapter."""
-        # Create Gemini adapter
-        gemini_adapter = GeminiLLMAdapter(
+        # One Gemini adapter (and so one model and connection) serves every agent
+        self._gemini_adapter = GeminiLLMAdapter(
             api_key=self.api_key,
             model="gemini-1.5-flash",
             temperature=0.7,
             max_tokens=2048
         )
         
+        # One memory backend shared by all agents; each agent keeps its own
+        # session id inside it, so conversations stay isolated
+        shared_memory = DictMemory()
+        
         # Create specialized agents
         self.agents = {
             "assistant": Agent(
-                llm=gemini_adapter,
+                llm=self._gemini_adapter,
                 name="AI Assistant",
                 system_prompt="You are a helpful AI assistant. Be concise and helpful.",
-                memory_backend="dict"
+                memory_backend=shared_memory
             ),
             
             "mathematician": Agent(
-                llm=gemini_adapter,
+                llm=self._gemini_adapter,
                 name="Math Expert",
                 system_prompt="You are a mathematics expert. Focus on mathematical problems and calculations.",
-                memory_backend="dict"
+                memory_backend=shared_memory
             ),
             
             "weather_agent": Agent(
-                llm=gemini_adapter,
+                llm=self._gemini_adapter,
                 name="Weather Expert",
                 system_prompt="You are a weather information specialist. Provide weather updates and forecasts.",
-                memory_backend="dict"
+                memory_backend=shared_memory
             )
         }
+        assert all(agent.llm is self._gemini_adapter for agent in self.agents.values())
         
         # Register tools with agents
-        self.agents["assistant"].register_tool(calculate._niflheim_tool)
-        self.agents["assistant"].register_tool(get_weather._niflheim_tool)
-        self.agents["assistant"].register_tool(get_current_time._niflheim_tool)
-        
-        self.agents["mathematician"].register_tool(calculate._niflheim_tool)
-        
-        self.agents["weather_agent"].register_tool(get_weather._niflheim_tool)
-        self.agents["weather_agent"].register_tool(get_current_time._niflheim_tool)
+        for agent_name, tool_names in _AGENT_TOOLS.items():
+            agent = self.agents[agent_name]
+            for tool_name in tool_names:
+                agent.register_tool(_TOOLS[tool_name])
         
         # Create orchestrator for multi-agent scenarios (disabled for now)
         # self.orchestrator = AgentOrchestrator(
@@ -115,7 +155,7 @@ class RealNiflheimDemo:
         """Simple chat with the assistant agent."""
         try:
             agent = self.agents["assistant"]
-            response = await agent.chat(message)
+            response = await self._inflight.do(("assistant", message), agent.chat, message)
             
             return {
                 "success": True,
@@ -134,7 +174,8 @@ class RealNiflheimDemo:
         """Solve mathematical problems using the math agent."""
         try:
             agent = self.agents["mathematician"]
-            response = await agent.chat(f"Solve this problem: {problem}")
+            prompt = f"Solve this problem: {problem}"
+            response = await self._inflight.do(("mathematician", prompt), agent.chat, prompt)
             
             return {
                 "success": True,
@@ -153,7 +194,8 @@ class RealNiflheimDemo:
         """Get weather information using the weather agent."""
         try:
             agent = self.agents["weather_agent"]
-            response = await agent.chat(f"What's the weather like in {location}?")
+            prompt = f"What's the weather like in {location}?"
+            response = await self._inflight.do(("weather_agent", prompt), agent.chat, prompt)
             
             return {
                 "success": True,
@@ -222,11 +264,28 @@ class RealNiflheimDemo:
         try:
             agent = self.agents["assistant"]
             
-            # Use chat_stream method
+            # Use chat_stream method, yielding batches of tokens rather than one at a time
+            buffer = []
+            last_flush = time.monotonic()
+            token = None
             async for token in agent.chat_stream(message):
+                buffer.append(token.content)
+                now = time.monotonic()
+                if (token.is_tool_call or token.finish_reason or len(buffer) >= _STREAM_FLUSH_TOKENS
+                        or now - last_flush >= _STREAM_FLUSH_SECONDS):
+                    yield {
+                        "success": True,
+                        "chunk": "".join(buffer),
+                        "is_tool_call": token.is_tool_call,
+                        "finish_reason": token.finish_reason
+                    }
+                    buffer = []
+                    last_flush = now
+            
+            if buffer:
                 yield {
                     "success": True,
-                    "chunk": token.content,
+                    "chunk": "".join(buffer),
                     "is_tool_call": token.is_tool_call,
                     "finish_reason": token.finish_reason
                 }
@@ -245,9 +304,14 @@ class RealNiflheimDemo:
             "version": "0.1.0",
             "llm_provider": "Gemini",
             "agents": list(self.agents.keys()),
-            "tools_available": ["calculate", "get_weather", "get_current_time"],
+            "tools_available": list(_TOOLS),
             "memory_backend": "DictMemory",
-            "orchestrator_enabled": self.orchestrator is not None
+            "orchestrator_enabled": self.orchestrator is not None,
+            "coalesced_requests": self._inflight.get_stats(),
+            "tool_cache": {
+                "calculate": calculate.__wrapped__.cache_info()._asdict(),
+                "get_weather": get_weather.__wrapped__.cache_info()._asdict()
+            }
         }
 
 
@@ -323,17 +387,21 @@ if __name__ == "__main__":
         print("=== Niflheim-X Framework Demo ===")
         print(f"Framework info: {demo.get_framework_info()}")
         
+        # Chat and math use different agents, so run them concurrently
+        chat_result, math_result = await asyncio.gather(
+            demo.simple_chat("Hello! What can you do?"),
+            demo.math_calculation("What is 15 * 23 + 45?")
+        )
+        
         # Test simple chat
         print("\n=== Simple Chat ===")
-        result = await demo.simple_chat("Hello! What can you do?")
-        print(f"Response: {result}")
+        print(f"Response: {chat_result}")
         
         # Test math calculation
         print("\n=== Math Calculation ===") 
-        result = await demo.math_calculation("What is 15 * 23 + 45?")
-        print(f"Math result: {result}")
+        print(f"Math result: {math_result}")
         
-        # Test memory
+        # Test memory (sequential: the recall depends on what was just stored)
         print("\n=== Memory Demo ===")
         result = await demo.memory_demo("Remember that my name is John and I like pizza.")
         print(f"Memory result: {result}")
@@ -0,0 +1,84 @@
+"""
+Safe Arithmetic Evaluation for Niflheim-X Demos
+
+Evaluates calculator input by walking its AST instead of calling eval():
+only numbers and the basic arithmetic operators are accepted, and anything
+else is rejected before it can run. Integer results are capped in size so
+inputs like 9**9**9 fail fast instead of tying up the process.
+
+Used by both the web app's calculator tool and the examples.
+"""
+
+import ast
+import functools
+import operator
+from typing import Union
+
+_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+# Largest integer result allowed, in bits (about 1200 decimal digits)
+MAX_RESULT_BITS = 4096
+
+
+def _check_pow(base: Union[int, float], exponent: Union[int, float]) -> None:
+    """Reject an integer power whose result would exceed MAX_RESULT_BITS, before computing it."""
+    if (isinstance(base, int) and isinstance(exponent, int) and abs(base) > 1
+            and exponent * base.bit_length() > MAX_RESULT_BITS):
+        raise ValueError("Result too large")
+
+
+def _safe_eval(node: ast.AST) -> Union[int, float]:
+    """Evaluate a whitelisted arithmetic AST node."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        left = _safe_eval(node.left)
+        right = _safe_eval(node.right)
+        if isinstance(node.op, ast.Pow):
+            _check_pow(left, right)
+        result = _BIN_OPS[type(node.op)](left, right)
+    elif isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        result = _UNARY_OPS[type(node.op)](_safe_eval(node.operand))
+    else:
+        raise ValueError("Unsupported expression")
+
+    # Operands are capped too, so products stay cheap to compute before this check
+    if isinstance(result, int) and result.bit_length() > MAX_RESULT_BITS:
+        raise ValueError("Result too large")
+    return result
+
+
+@functools.lru_cache(maxsize=256)
+def _parse(expression: str) -> ast.AST:
+    """Parse an expression once; repeated queries reuse the cached tree."""
+    return ast.parse(expression, mode='eval').body
+
+
+def safe_eval(expression: str) -> Union[int, float]:
+    """
+    Evaluate a basic arithmetic expression without eval().
+
+    Args:
+        expression: Expression such as "25 * 4 + 10"
+
+    Returns:
+        Numeric result
+
+    Raises:
+        SyntaxError: If the expression cannot be parsed
+        ValueError: If the expression uses anything besides numbers and + - * / // **,
+            or an integer result would exceed MAX_RESULT_BITS
+    """
+    return _safe_eval(_parse(expression.strip()))
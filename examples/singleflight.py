@@ -0,0 +1,55 @@
+"""
+In-flight Request Coalescing for Niflheim-X Demos
+
+Concurrent calls that share a key are collapsed into a single call: the first
+caller starts the work and everyone else awaits the same task. Nothing is
+cached once the call finishes, so later requests always hit the API again.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent identical coroutine calls.
+    Keeps hit/miss counters so callers can report how often calls were shared.
+    """
+
+    def __init__(self):
+        """Initialize an empty in-flight call table."""
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run func(*args, **kwargs) unless a call with the same key is already running.
+
+        Args:
+            key: Identifies calls that are interchangeable
+            func: Coroutine function to call
+
+        Returns:
+            Result of the (possibly shared) call
+        """
+        # No await between the lookup and the insert, so this is atomic on the event loop
+        task = self._calls.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.hits += 1
+
+        # Shield so one cancelled caller doesn't cancel the call for everyone else
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get coalescing statistics."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'in_flight': len(self._calls)
+        }
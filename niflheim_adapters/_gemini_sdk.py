@@ -0,0 +1,204 @@
+"""
+Shared Gemini SDK state and helpers for the Niflheim-X adapters.
+
+The SDK keeps one process-wide client (and gRPC channel) that every
+GenerativeModel shares, but genai.configure() throws it away. Both adapters
+configure the SDK through here so creating another adapter with the same key
+doesn't reset the shared connection pool, and they get their (stateless)
+models from get_model() so adapters with the same settings share one.
+
+The SDK itself (which pulls in gRPC, protobuf and google-auth) is only
+imported once the first adapter is created.
+"""
+
+import asyncio
+import functools
+import os
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import google.generativeai as genai
+
+# Streamed text is yielded in batches: a batch closes once it holds
+# STREAM_BATCH_SIZE chunks (growing by STREAM_BATCH_GROWTH per flush up to
+# STREAM_MAX_BATCH_SIZE) or once its first chunk is STREAM_FLUSH_MS old
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 8))
+STREAM_MAX_BATCH_SIZE = int(os.getenv("STREAM_MAX_BATCH_SIZE", 64))
+STREAM_BATCH_GROWTH = 3
+STREAM_FLUSH_MS = float(os.getenv("STREAM_FLUSH_MS", 20))
+
+# Connection checks give up after this long
+PROBE_TIMEOUT_SECONDS = 2.0
+
+_configured_api_key: Optional[str] = None
+
+
+@functools.lru_cache(maxsize=None)
+def _genai():
+    """Import the Gemini SDK on first use."""
+    try:
+        import google.generativeai as genai
+    except ImportError as e:
+        raise ImportError(
+            "The Gemini adapters need google-generativeai: pip install google-generativeai"
+        ) from e
+    return genai
+
+
+@functools.lru_cache(maxsize=None)
+def safety_settings() -> Dict:
+    """Get the safety settings used by every model the adapters create (built once)."""
+    from google.generativeai.types import HarmBlockThreshold, HarmCategory
+
+    return {
+        HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+        HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+        HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+        HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+    }
+
+
+def configure_api_key(api_key: str) -> None:
+    """Configure the Gemini SDK unless it already uses this API key."""
+    global _configured_api_key
+    if api_key != _configured_api_key:
+        _genai().configure(api_key=api_key)
+        _configured_api_key = api_key
+
+
+def get_model(
+    api_key: str,
+    model_name: str,
+    temperature: float,
+    max_output_tokens: int,
+    extra_config: Optional[Dict[str, Any]] = None,
+) -> "genai.GenerativeModel":
+    """
+    Get the shared GenerativeModel for these settings, creating it on first use.
+
+    The SDK's API key is process-wide (genai.configure), so models don't keep
+    their own key; the adapters assume one key per process.
+
+    Args:
+        api_key: Google API key for Gemini
+        model_name: Model to use
+        temperature: Sampling temperature
+        max_output_tokens: Maximum tokens in response
+        extra_config: Other GenerationConfig fields, e.g. stop_sequences
+
+    Returns:
+        GenerativeModel configured with safety_settings()
+    """
+    # Lists (stop_sequences) are frozen into tuples so the settings can key the cache
+    frozen = tuple(sorted(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in (extra_config or {}).items()
+    ))
+    try:
+        return _cached_model(api_key, model_name, temperature, max_output_tokens, frozen)
+    except TypeError:
+        # Some other unhashable value: build a model just for this adapter
+        return _create_model(api_key, model_name, temperature, max_output_tokens, extra_config or {})
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_model(
+    api_key: str,
+    model_name: str,
+    temperature: float,
+    max_output_tokens: int,
+    frozen_config: Tuple[Tuple[str, Any], ...],
+) -> "genai.GenerativeModel":
+    """Create the model for get_model once per distinct set of settings."""
+    extra_config = {name: list(value) if isinstance(value, tuple) else value for name, value in frozen_config}
+    return _create_model(api_key, model_name, temperature, max_output_tokens, extra_config)
+
+
+def _create_model(
+    api_key: str,
+    model_name: str,
+    temperature: float,
+    max_output_tokens: int,
+    extra_config: Dict[str, Any],
+) -> "genai.GenerativeModel":
+    """Create a GenerativeModel with the adapters' safety settings."""
+    configure_api_key(api_key)
+    genai = _genai()
+    return genai.GenerativeModel(
+        model_name=model_name,
+        generation_config=genai.GenerationConfig(
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            **extra_config
+        ),
+        safety_settings=safety_settings(),
+    )
+
+
+async def probe(api_key: str, model_name: str) -> None:
+    """
+    Check that the API answers for this model with a one-token request.
+
+    Raises:
+        Exception: If the request fails or takes longer than PROBE_TIMEOUT_SECONDS
+    """
+    model = get_model(api_key, model_name, 0.0, 1)
+    await asyncio.wait_for(model.generate_content_async("ping"), timeout=PROBE_TIMEOUT_SECONDS)
+
+
+async def iter_text_batches(response) -> AsyncIterator[str]:
+    """
+    Yield the text of a streamed SDK response in size- and time-bounded batches.
+
+    Args:
+        response: Async-iterable streamed response from the SDK
+
+    Yields:
+        Concatenated text of each batch
+    """
+    loop = asyncio.get_running_loop()
+    chunks = response.__aiter__()
+    batch_size = STREAM_BATCH_SIZE
+    buffer = []
+    deadline = 0.0
+    next_chunk = None
+
+    try:
+        while True:
+            if next_chunk is None:
+                next_chunk = asyncio.ensure_future(chunks.__anext__())
+
+            # Wait for the next chunk only until the open batch is due; waiting on
+            # the task (rather than wait_for) leaves the pending read intact
+            if buffer:
+                done, _ = await asyncio.wait({next_chunk}, timeout=max(0.0, deadline - loop.time()))
+                if not done:
+                    yield "".join(buffer)
+                    buffer = []
+                    batch_size = min(STREAM_MAX_BATCH_SIZE, batch_size * STREAM_BATCH_GROWTH)
+                    continue
+
+            try:
+                chunk = await next_chunk
+            except StopAsyncIteration:
+                break
+            next_chunk = None
+
+            text = chunk.text
+            if not text:
+                continue
+            if not buffer:
+                deadline = loop.time() + STREAM_FLUSH_MS / 1000
+            buffer.append(text)
+
+            if len(buffer) >= batch_size:
+                yield "".join(buffer)
+                buffer = []
+                batch_size = min(STREAM_MAX_BATCH_SIZE, batch_size * STREAM_BATCH_GROWTH)
+
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        # The consumer stopped early: don't leave a read pending on the stream
+        if next_chunk is not None and not next_chunk.done():
+            next_chunk.cancel()
@@ -5,13 +5,20 @@ A lightweight adapter that integrates Google's Gemini API with the niflheim-x fr
 
 import asyncio
 import logging
+from collections import deque
 from typing import Dict, Any, Optional, AsyncGenerator, List
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
+
+from ._gemini_sdk import configure_api_key, get_model, iter_text_batches, probe
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Messages (user + assistant) of conversation history GeminiAgentAdapter keeps
+_HISTORY_MAX_MESSAGES = 20
+
+# Prompt line prefix per message role; messages with other roles are left out
+_ROLE_PREFIX = {'system': 'System: ', 'user': 'Human: ', 'assistant': 'Assistant: '}
+
 class GeminiAdapter:
     """
     Lightweight Gemini API adapter for niflheim-x framework.
@@ -24,6 +31,7 @@ class GeminiAdapter:
         model_name: str = "gemini-1.5-flash",
         temperature: float = 0.7,
         max_output_tokens: int = 2048,
+        max_concurrency: int = 32,
         **kwargs
     ):
         """
@@ -34,31 +42,24 @@ class GeminiAdapter:
             model_name: Model to use (default: gemini-1.5-flash)
             temperature: Sampling temperature
             max_output_tokens: Maximum tokens in response
+            max_concurrency: Most requests this adapter sends at once
         """
         self.api_key = api_key
         self.model_name = model_name
         self.temperature = temperature
         self.max_output_tokens = max_output_tokens
         
-        # Configure the API
-        genai.configure(api_key=api_key)
-        
-        # Initialize the model
-        self.model = genai.GenerativeModel(
-            model_name=model_name,
-            generation_config=genai.types.GenerationConfig(
-                temperature=temperature,
-                max_output_tokens=max_output_tokens,
-                **kwargs
-            ),
-            safety_settings={
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-            }
+        # Configure the API (keeps the shared client if the key is unchanged)
+        configure_api_key(api_key)
+        
+        # Shared with every adapter that uses the same settings
+        self.model = get_model(
+            api_key, model_name, temperature, max_output_tokens, kwargs
         )
         
+        # Caps in-flight requests (streams hold a slot until they finish) so bursts queue here
+        self._request_slots = asyncio.BoundedSemaphore(max_concurrency)
+        
         logger.info(f"Gemini adapter initialized with model: {model_name}")
     
     async def generate(self, prompt: str, **kwargs) -> str:
@@ -71,29 +72,14 @@ class GeminiAdapter:
             
         Returns:
             Generated text response
-        """
-        try:
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None, 
-                self._sync_generate, 
-                prompt
-            )
-            return response
             
-        except Exception as e:
-            logger.error(f"Generation error: {e}")
-            raise
-    
-    def _sync_generate(self, prompt: str) -> str:
-        """Synchronous generation method."""
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            logger.error(f"Sync generation error: {e}")
-            raise
+        Raises:
+            Exception: SDK errors, left to the caller to handle and log once
+        """
+        # Native async call; runs on the event loop without a thread hop
+        async with self._request_slots:
+            response = await self.model.generate_content_async(prompt)
+        return response.text
     
     async def generate_stream(self, prompt: str, **kwargs) -> AsyncGenerator[str, None]:
         """
@@ -107,23 +93,39 @@ class GeminiAdapter:
             Chunks of generated text
         """
         try:
-            loop = asyncio.get_event_loop()
-            
-            # Create streaming response
-            def _create_stream():
-                return self.model.generate_content(prompt, stream=True)
-            
-            response = await loop.run_in_executor(None, _create_stream)
-            
-            # Yield chunks as they arrive
-            for chunk in response:
-                if chunk.text:
-                    yield chunk.text
+            async with self._request_slots:
+                # Create streaming response
+                response = await self.model.generate_content_async(prompt, stream=True)
+                
+                # Yield chunks as they arrive, batched to cut per-chunk overhead
+                async for text in iter_text_batches(response):
+                    yield text
                     
         except Exception as e:
             logger.error(f"Streaming error: {e}")
             yield f"Error: {str(e)}"
     
+    async def stream_text(self, prompt: str) -> AsyncGenerator[str, None]:
+        """
+        Stream the response text chunk by chunk, holding a request slot until it ends.
+        
+        Unlike generate_stream, chunks aren't batched and errors are raised
+        rather than yielded.
+        
+        Args:
+            prompt: Input prompt for the model
+            
+        Yields:
+            Text of each non-empty chunk
+        """
+        async with self._request_slots:
+            response = await self.model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                # .text is a computed property: read it once per chunk
+                text = chunk.text
+                if text:
+                    yield text
+    
     async def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
         """
         Chat interface for conversational interactions.
@@ -135,31 +137,26 @@ class GeminiAdapter:
         Returns:
             Generated response
         """
-        try:
-            # Convert messages to a single prompt for Gemini
-            prompt = self._messages_to_prompt(messages)
-            return await self.generate(prompt, **kwargs)
-            
-        except Exception as e:
-            logger.error(f"Chat error: {e}")
-            raise
+        # Convert messages to a single prompt for Gemini
+        prompt = self._messages_to_prompt(messages)
+        return await self.generate(prompt, **kwargs)
     
     def _messages_to_prompt(self, messages: List[Dict[str, str]]) -> str:
         """Convert message list to a single prompt string."""
-        prompt_parts = []
-        
-        for message in messages:
-            role = message.get('role', 'user')
-            content = message.get('content', '')
-            
-            if role == 'system':
-                prompt_parts.append(f"System: {content}")
-            elif role == 'user':
-                prompt_parts.append(f"Human: {content}")
-            elif role == 'assistant':
-                prompt_parts.append(f"Assistant: {content}")
-        
-        return "\n\n".join(prompt_parts) + "\n\nAssistant:"
+        # One role lookup per message: the prefix found by the filter is reused
+        body = "\n\n".join(
+            prefix + message.get('content', '')
+            for message in messages
+            if (prefix := _ROLE_PREFIX.get(message.get('role', 'user'))) is not None
+        )
+        return body + "\n\nAssistant:"
+    
+    def _render_message(self, message: Dict[str, str]) -> Optional[str]:
+        """Render one message as a prompt line, or None for unknown roles."""
+        prefix = _ROLE_PREFIX.get(message.get('role', 'user'))
+        if prefix is None:
+            return None
+        return prefix + message.get('content', '')
     
     def get_model_info(self) -> Dict[str, Any]:
         """
@@ -178,14 +175,14 @@ class GeminiAdapter:
     
     async def test_connection(self) -> bool:
         """
-        Test the connection to the Gemini API.
+        Test the connection to the Gemini API with a one-token probe.
         
         Returns:
             True if connection is successful, False otherwise
         """
         try:
-            test_response = await self.generate("Hello! Please respond with 'Connection successful.'")
-            return "successful" in test_response.lower()
+            await probe(self.api_key, self.model_name)
+            return True
         except Exception as e:
             logger.error(f"Connection test failed: {e}")
             return False
@@ -199,42 +196,54 @@ class GeminiAgentAdapter:
     def __init__(self, api_key: str, **kwargs):
         """Initialize the agent adapter."""
         self.gemini = GeminiAdapter(api_key, **kwargs)
-        self.conversation_history = []
+        # Keep history manageable (last 10 exchanges); the deques drop the oldest turns
+        self.conversation_history = deque(maxlen=_HISTORY_MAX_MESSAGES)
+        # conversation_history already rendered as prompt lines, kept in step with it
+        self._rendered_history = deque(maxlen=_HISTORY_MAX_MESSAGES)
+        # Last system prompt seen and its rendered prompt line (it rarely changes between turns)
+        self._system_prompt: Optional[str] = None
+        self._system_line: Optional[str] = None
     
     async def send_message(self, message: str, system_prompt: Optional[str] = None) -> str:
         """
         Send a message and get a response.
         This method provides the interface expected by niflheim-x agents.
         """
-        # Build conversation context
-        messages = []
+        user_message = {'role': 'user', 'content': message}
+        user_line = self.gemini._render_message(user_message)
         
+        # Build conversation context from a snapshot; earlier turns were rendered when they happened
+        prompt_parts = []
         if system_prompt:
-            messages.append({'role': 'system', 'content': system_prompt})
-        
-        # Add conversation history
-        messages.extend(self.conversation_history)
-        
-        # Add current message
-        messages.append({'role': 'user', 'content': message})
-        
-        # Get response
-        response = await self.gemini.chat(messages)
-        
-        # Update conversation history
-        self.conversation_history.append({'role': 'user', 'content': message})
-        self.conversation_history.append({'role': 'assistant', 'content': response})
-        
-        # Keep history manageable (last 10 exchanges)
-        if len(self.conversation_history) > 20:
-            self.conversation_history = self.conversation_history[-20:]
+            if system_prompt != self._system_prompt:
+                self._system_prompt = system_prompt
+                self._system_line = self.gemini._render_message({'role': 'system', 'content': system_prompt})
+            prompt_parts.append(self._system_line)
+        prompt_parts.extend(self._rendered_history)
+        prompt_parts.append(user_line)
+        
+        # Get response; concurrent turns run in parallel
+        response = await self.gemini.generate("\n\n".join(prompt_parts) + "\n\nAssistant:")
+        
+        # Update conversation history, keeping each user/assistant pair together
+        assistant_message = {'role': 'assistant', 'content': response}
+        self.conversation_history.append(user_message)
+        self.conversation_history.append(assistant_message)
+        self._rendered_history.append(user_line)
+        self._rendered_history.append(self.gemini._render_message(assistant_message))
         
         return response
     
     def clear_history(self):
         """Clear conversation history."""
-        self.conversation_history = []
+        self.conversation_history.clear()
+        self._rendered_history.clear()
     
     async def generate_response(self, prompt: str) -> str:
         """Simple generation method for tool integrations."""
-        return await self.gemini.generate(prompt)
\ No newline at end of file
+        return await self.gemini.generate(prompt)
+    
+    async def stream_response(self, prompt: str) -> AsyncGenerator[str, None]:
+        """Streaming counterpart of generate_response; errors are raised rather than yielded."""
+        async for text in self.gemini.stream_text(prompt):
+            yield text
\ No newline at end of file
@@ -7,14 +7,29 @@ following the framework's LLMAdapter interface.
 
 import asyncio
 import json
-from typing import AsyncIterator, Dict, List, Optional
-
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
+from collections import OrderedDict
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
 
 from niflheim_x.llms.base import LLMAdapter
 from niflheim_x.core.types import Message, AgentResponse, LLMConfig, StreamingToken, MessageRole
 
+from ._gemini_sdk import configure_api_key, get_model, iter_text_batches, probe
+
+if TYPE_CHECKING:
+    from google.generativeai import ChatSession
+
+# Conversations whose converted history is kept (the adapter is shared between agents)
+_HISTORY_CACHE_SIZE = 32
+
+
+# Gemini role for each niflheim_x role it accepts (system messages travel in the user turn)
+_GEMINI_ROLES = {MessageRole.USER: "user", MessageRole.ASSISTANT: "model"}
+
+
+def _render_system_prefix(system_instruction: Optional[str]) -> str:
+    """Render the text put before the latest user message to carry the system instruction."""
+    return f"System: {system_instruction}\n\nUser: " if system_instruction else ""
+
 
 class GeminiLLMAdapter(LLMAdapter):
     """Gemini LLM adapter that integrates with Niflheim_x framework."""
@@ -23,6 +38,7 @@ class GeminiLLMAdapter(LLMAdapter):
         self,
         api_key: str,
         model: str = "gemini-1.5-flash",
+        max_concurrency: int = 32,
         **config_kwargs
     ):
         """Initialize the Gemini adapter.
@@ -30,6 +46,7 @@ class GeminiLLMAdapter(LLMAdapter):
         Args:
             api_key: Google Gemini API key
             model: Model name to use
+            max_concurrency: Most requests this adapter sends at once (it's shared by agents)
             **config_kwargs: Additional configuration options
         """
         # Create LLM configuration
@@ -42,44 +59,43 @@ class GeminiLLMAdapter(LLMAdapter):
         # Store API key separately
         self.api_key = api_key
         
-        # Configure Gemini API
-        genai.configure(api_key=api_key)
-        
-        # Initialize the model
-        self.model = genai.GenerativeModel(
-            model_name=self.config.model,
-            generation_config=genai.GenerationConfig(
-                temperature=self.config.temperature,
-                max_output_tokens=self.config.max_tokens or 2048,
-            ),
-            safety_settings={
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-            }
+        # Configure Gemini API (keeps the shared client if the key is unchanged)
+        configure_api_key(api_key)
+        
+        # Shared with every adapter that uses the same settings
+        self.model = get_model(
+            api_key, self.config.model, self.config.temperature, self.config.max_tokens or 2048
         )
+        
+        # Caps in-flight requests (streams hold a slot until they finish) so bursts queue here
+        self._request_slots = asyncio.BoundedSemaphore(max_concurrency)
+        
+        # Converted history per conversation, kept as parallel role/text lists and
+        # keyed by id() of its first non-system message
+        self._history_cache: "OrderedDict[int, Dict]" = OrderedDict()
     
     def _convert_messages_to_gemini_format(self, messages: List[Message]) -> List[Dict]:
         """Convert Niflheim_x messages to Gemini format."""
-        gemini_messages = []
+        roles, texts = self._split_messages(messages)
+        return self._to_gemini_history(roles, texts)
+    
+    def _split_messages(self, messages: List[Message]) -> Tuple[List[str], List[str]]:
+        """Get the Gemini roles and texts of the messages Gemini accepts, as parallel lists."""
+        roles = []
+        texts = []
         
         for msg in messages:
-            if msg.role == MessageRole.SYSTEM:
-                # Gemini doesn't have system role, prepend to first user message
-                continue
-            elif msg.role == MessageRole.USER:
-                gemini_messages.append({
-                    "role": "user",
-                    "parts": [{"text": msg.content}]
-                })
-            elif msg.role == MessageRole.ASSISTANT:
-                gemini_messages.append({
-                    "role": "model",
-                    "parts": [{"text": msg.content}]
-                })
-        
-        return gemini_messages
+            # Gemini doesn't have system role, it's prepended to the latest user message
+            role = _GEMINI_ROLES.get(msg.role)
+            if role is not None:
+                roles.append(role)
+                texts.append(msg.content)
+        
+        return roles, texts
+    
+    def _to_gemini_history(self, roles: List[str], texts: List[str]) -> List[Dict]:
+        """Build the message dicts the SDK expects from parallel role/text lists."""
+        return [{"role": role, "parts": [{"text": text}]} for role, text in zip(roles, texts)]
     
     def _get_system_instruction(self, messages: List[Message]) -> Optional[str]:
         """Extract system instruction from messages."""
@@ -88,6 +104,97 @@ class GeminiLLMAdapter(LLMAdapter):
                 return msg.content
         return None
     
+    def _prepare_history(self, messages: List[Message]) -> Tuple[List[str], List[str], str, Optional[Dict]]:
+        """Convert messages to Gemini format, only converting turns added since the last call.
+        
+        Agents pass the same Message objects back every turn (except the system
+        message, which niflheim_x re-creates at the front each time), so a
+        conversation is recognised by the identity of its first non-system
+        message and of the last message converted. Anything else (a new
+        conversation, a sliding memory window) is converted from scratch.
+        
+        Returns:
+            The Gemini roles and texts of the converted messages, the prefix
+            to put before the latest user message (carrying the system
+            instruction), and the cache entry
+        """
+        # The system message sits at the front, so this is a short scan
+        system_instruction = self._get_system_instruction(messages)
+        anchor = next((msg for msg in messages if msg.role != MessageRole.SYSTEM), None)
+        if anchor is None:
+            return [], [], _render_system_prefix(system_instruction), None
+        
+        entry = self._history_cache.get(id(anchor))
+        if (entry is not None and entry["anchor"] is anchor and entry["length"] <= len(messages)
+                and messages[entry["length"] - 1] is entry["last"]):
+            roles, texts = self._split_messages(messages[entry["length"]:])
+            entry["roles"].extend(roles)
+            entry["texts"].extend(texts)
+            self._history_cache.move_to_end(id(anchor))
+        else:
+            roles, texts = self._split_messages(messages)
+            entry = {"anchor": anchor, "roles": roles, "texts": texts}
+            self._history_cache[id(anchor)] = entry
+            if len(self._history_cache) > _HISTORY_CACHE_SIZE:
+                self._history_cache.popitem(last=False)
+        
+        entry["length"] = len(messages)
+        entry["last"] = messages[-1]
+        
+        # The system prompt is the same every turn, so render its prefix only when it changes
+        if "prefix" not in entry or entry["system_instruction"] != system_instruction:
+            entry["system_instruction"] = system_instruction
+            entry["prefix"] = _render_system_prefix(system_instruction)
+        return entry["roles"], entry["texts"], entry["prefix"], entry
+    
+    def _checkout_chat(self, entry: Optional[Dict], roles: List[str], texts: List[str]) -> Tuple["ChatSession", bool]:
+        """Get a chat session holding every message but the latest.
+        
+        The conversation's cached session is reused when it already ends with
+        the reply the agent stored, so only the new user turn is sent. If the
+        session is in use by a concurrent request, a throwaway one is started.
+        
+        Only a new session needs the history as SDK message dicts; a reused
+        one already holds it.
+        
+        Returns:
+            The session, and whether it was checked out of the cache (and must
+            be handed back with _release_chat)
+        """
+        if entry is None or entry.get("busy"):
+            return self.model.start_chat(history=self._to_gemini_history(roles[:-1], texts[:-1])), False
+        
+        chat = entry.get("chat")
+        if chat is None or entry["chat_len"] != len(texts) - 1 or texts[-2] != entry["reply"]:
+            chat = self.model.start_chat(history=self._to_gemini_history(roles[:-1], texts[:-1]))
+        
+        entry["chat"] = None
+        entry["busy"] = True
+        return chat, True
+    
+    def _release_chat(
+        self, entry: Dict, chat: "ChatSession", chat_len: int, user_text: str, reply: Optional[str]
+    ) -> None:
+        """Return a checked-out session; reply is None if the exchange didn't complete.
+        
+        The session recorded the user turn as sent, with the system prefix. It's
+        stored back as the plain user_text so the history matches one rebuilt
+        from memory, and the prefix only ever travels with the latest turn.
+        """
+        entry["busy"] = False
+        if reply is None:
+            return
+        
+        try:
+            chat.history[-2].parts[0].text = user_text
+        except Exception:
+            # The SDK refuses to build a history after a broken response; drop the session
+            return
+        
+        entry["chat"] = chat
+        entry["chat_len"] = chat_len
+        entry["reply"] = reply
+    
     async def generate_response(
         self,
         messages: List[Message],
@@ -104,60 +211,73 @@ class GeminiLLMAdapter(LLMAdapter):
         Returns:
             Response from Gemini
         """
-        try:
-            # Get system instruction
-            system_instruction = self._get_system_instruction(messages)
-            
-            # Convert messages to Gemini format
-            gemini_messages = self._convert_messages_to_gemini_format(messages)
-            
-            # Create chat session
-            chat = self.model.start_chat(history=gemini_messages[:-1] if len(gemini_messages) > 1 else [])
-            
-            # Get the latest user message
-            latest_message = gemini_messages[-1]["parts"][0]["text"] if gemini_messages else ""
-            
-            # Add system instruction to the message if present
-            if system_instruction:
-                latest_message = f"System: {system_instruction}\n\nUser: {latest_message}"
-            
-            if stream:
-                # For streaming, we need to collect all chunks first
-                response_text = ""
+        # Convert messages to Gemini format and get the system instruction prefix
+        roles, texts, system_prefix, entry = self._prepare_history(messages)
+        
+        # Get the latest user message, with the system instruction if present
+        latest_message = system_prefix + (texts[-1] if texts else "")
+        
+        if stream:
+            # For streaming, we need to collect all chunks first (joined once at the end)
+            parts = []
+            try:
                 async for chunk in self.stream_response(messages, tools):
-                    response_text += chunk.content
-                
-                return AgentResponse(
-                    content=response_text,
-                    metadata={
-                        "model": self.config.model,
-                        "provider": "gemini",
-                        "stream": True
-                    }
-                )
-            else:
-                # Non-streaming response
-                response = await asyncio.to_thread(chat.send_message, latest_message)
-                
-                return AgentResponse(
-                    content=response.text,
-                    metadata={
-                        "model": self.config.model,
-                        "provider": "gemini",
-                        "stream": False
-                    }
-                )
-                
-        except Exception as e:
+                    parts.append(chunk.content)
+            except Exception as e:
+                return self._error_response(e)
+            
             return AgentResponse(
-                content=f"Error generating response: {str(e)}",
+                content="".join(parts),
                 metadata={
-                    "error": True,
-                    "error_type": type(e).__name__,
                     "model": self.config.model,
-                    "provider": "gemini"
+                    "provider": "gemini",
+                    "stream": True
                 }
             )
+        
+        if len(texts) == 1:
+            # Single turn: no history to carry, so skip the chat session
+            try:
+                async with self._request_slots:
+                    response = await self.model.generate_content_async(latest_message)
+                reply = response.text
+            except Exception as e:
+                return self._error_response(e)
+        else:
+            # Non-streaming response, on the conversation's chat session
+            chat, owned = self._checkout_chat(entry, roles, texts)
+            chat_len = len(texts) + 1
+            reply = None
+            try:
+                async with self._request_slots:
+                    response = await chat.send_message_async(latest_message)
+                reply = response.text
+            except Exception as e:
+                return self._error_response(e)
+            finally:
+                if owned:
+                    self._release_chat(entry, chat, chat_len, texts[-1], reply)
+        
+        return AgentResponse(
+            content=reply,
+            metadata={
+                "model": self.config.model,
+                "provider": "gemini",
+                "stream": False
+            }
+        )
+    
+    def _error_response(self, error: Exception) -> AgentResponse:
+        """Report a failed Gemini call as an error response."""
+        return AgentResponse(
+            content=f"Error generating response: {str(error)}",
+            metadata={
+                "error": True,
+                "error_type": type(error).__name__,
+                "model": self.config.model,
+                "provider": "gemini"
+            }
+        )
     
     async def stream_response(
         self,
@@ -171,51 +291,59 @@ class GeminiLLMAdapter(LLMAdapter):
             tools: Available tools for the LLM to call
             
         Yields:
-            Individual tokens from the response
-        """
-        try:
-            # Get system instruction
-            system_instruction = self._get_system_instruction(messages)
-            
-            # Convert messages to Gemini format
-            gemini_messages = self._convert_messages_to_gemini_format(messages)
-            
-            # Create chat session
-            chat = self.model.start_chat(history=gemini_messages[:-1] if len(gemini_messages) > 1 else [])
+            Individual tokens from the response, or a single token with
+            finish_reason "error" if the request could not be started
             
-            # Get the latest user message
-            latest_message = gemini_messages[-1]["parts"][0]["text"] if gemini_messages else ""
-            
-            # Add system instruction to the message if present
-            if system_instruction:
-                latest_message = f"System: {system_instruction}\n\nUser: {latest_message}"
-            
-            # Generate streaming response
-            response = await asyncio.to_thread(
-                lambda: chat.send_message(latest_message, stream=True)
-            )
-            
-            for chunk in response:
-                if chunk.text:
+        Raises:
+            Exception: If the stream breaks after tokens were yielded
+        """
+        owned = False
+        completed = False
+        parts = []
+        # Holds a request slot for the whole stream
+        async with self._request_slots:
+            try:
+                try:
+                    # Convert messages to Gemini format and get the system instruction prefix
+                    roles, texts, system_prefix, entry = self._prepare_history(messages)
+                    
+                    # Get the latest user message, with the system instruction if present
+                    latest_message = system_prefix + (texts[-1] if texts else "")
+                    
+                    # Generate streaming response, on the conversation's chat session
+                    chat, owned = self._checkout_chat(entry, roles, texts)
+                    chat_len = len(texts) + 1
+                    response = await chat.send_message_async(latest_message, stream=True)
+                except Exception as e:
                     yield StreamingToken(
-                        content=chunk.text,
+                        content=f"Error streaming response: {str(e)}",
+                        is_tool_call=False,
+                        finish_reason="error"
+                    )
+                    return
+                
+                # Batched so consumers see fewer, larger tokens. Errors from here on
+                # propagate, so they can't end up in the conversation as model output
+                async for text in iter_text_batches(response):
+                    parts.append(text)
+                    yield StreamingToken(
+                        content=text,
                         is_tool_call=False,
                         finish_reason=None
                     )
-                    
-        except Exception as e:
-            yield StreamingToken(
-                content=f"Error streaming response: {str(e)}",
-                is_tool_call=False,
-                finish_reason="error"
-            )
+                completed = True
+            finally:
+                # A stream that was cut short leaves the session's history unusable
+                if owned:
+                    self._release_chat(
+                        entry, chat, chat_len, texts[-1], "".join(parts) if completed else None
+                    )
     
     async def validate_connection(self) -> bool:
-        """Validate that the Gemini connection is working."""
+        """Validate that the Gemini connection is working (one-token probe)."""
         try:
-            test_messages = [Message(role=MessageRole.USER, content="Hello")]
-            response = await self.generate_response(test_messages)
-            return not response.metadata.get("error", False)
+            await probe(self.api_key, self.config.model)
+            return True
         except Exception:
             return False
     
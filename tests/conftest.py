@@ -0,0 +1,60 @@
+"""
+Shared fixtures for the Niflheim-X demo tests.
+
+No test talks to the Gemini API: adapters get a fake async client in place of
+the SDK's, so the real GenerativeModel / ChatSession code still runs.
+"""
+
+import google.ai.generativelanguage as glm
+import pytest
+
+from niflheim_adapters import _gemini_sdk
+
+
+def _response(text: str) -> glm.GenerateContentResponse:
+    """Build an SDK response holding one model candidate with this text."""
+    return glm.GenerateContentResponse(candidates=[glm.Candidate(
+        content=glm.Content(role="model", parts=[glm.Part(text=text)]),
+        finish_reason=glm.Candidate.FinishReason.STOP,
+    )])
+
+
+class FakeAsyncClient:
+    """Stands in for the SDK's async generative client and records every request."""
+
+    def __init__(self, chunk_size: int = 4):
+        self.requests = []
+        self.chunk_size = chunk_size
+
+    def _reply(self, request) -> str:
+        """Record the request's (role, text) turns and make up a reply."""
+        self.requests.append([(c.role, c.parts[0].text) for c in request.contents])
+        return f"R{len(self.requests)}"
+
+    async def generate_content(self, request):
+        return _response(self._reply(request))
+
+    async def stream_generate_content(self, request):
+        text = self._reply(request) + " streamed"
+
+        async def chunks():
+            for i in range(0, len(text), self.chunk_size):
+                yield _response(text[i:i + self.chunk_size])
+        return chunks()
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    """A fake client wired into every model the adapters create during the test."""
+    client = FakeAsyncClient()
+    create_model = _gemini_sdk._create_model
+
+    def create_fake_model(*args, **kwargs):
+        model = create_model(*args, **kwargs)
+        model._async_client = client
+        return model
+
+    monkeypatch.setattr(_gemini_sdk, "_create_model", create_fake_model)
+    _gemini_sdk._cached_model.cache_clear()
+    yield client
+    _gemini_sdk._cached_model.cache_clear()
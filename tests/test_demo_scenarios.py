@@ -0,0 +1,63 @@
+"""Tests for the memory recall index in examples.demo_scenarios."""
+
+import asyncio
+
+import pytest
+
+from examples.demo_scenarios import _RECALL_TOP_K, DemoScenarios
+
+
+@pytest.fixture
+def demo(fake_client):
+    """DemoScenarios whose memory agent echoes the prompt it was sent."""
+    scenarios = DemoScenarios("test-key", max_memories=10)
+
+    async def echo(message, system_prompt=None):
+        return message
+    scenarios.memory_agent.send_message = echo
+    return scenarios
+
+
+def _ask(demo, message):
+    return asyncio.run(demo.memory_demo(message))
+
+
+def test_few_memories_are_all_recalled(demo):
+    _ask(demo, "Remember my name is Sam")
+    _ask(demo, "I like pizza")
+
+    prompt = _ask(demo, "What do you know?")
+    assert "Memory 1: Remember my name is Sam\nMemory 2: I like pizza" in prompt
+
+
+def test_recall_picks_matching_memories(demo):
+    for i in range(_RECALL_TOP_K + 3):
+        _ask(demo, f"Remember fact number {i} about gardening")
+    _ask(demo, "I love sailing on weekends")
+
+    prompt = _ask(demo, "When do I go sailing?")
+    assert "sailing on weekends" in prompt
+    assert prompt.count("Memory ") <= _RECALL_TOP_K
+
+
+def test_evicted_memories_leave_the_index(demo):
+    _ask(demo, "I like zebras")
+    for i in range(10):
+        _ask(demo, f"Remember item {i}")
+
+    assert "zebras" not in demo._memory_index
+    prompt = _ask(demo, "Tell me about zebras")
+    assert "zebras" not in prompt.split("User asks:")[0]
+    assert "Memory 11: Remember item 9" in prompt
+
+
+def test_clear_memory_resets_index(demo):
+    _ask(demo, "I like tea")
+    demo.clear_memory()
+
+    assert not demo.memory_store
+    assert not demo._memory_index
+    assert demo.get_memory_summary() == []
+
+    _ask(demo, "I like coffee")
+    assert "Memory 1: I like coffee" in _ask(demo, "What drink did I mention?")
@@ -0,0 +1,126 @@
+"""Tests for GeminiLLMAdapter's history cache and chat session reuse."""
+
+import asyncio
+
+from niflheim_x import Agent, DictMemory
+
+from niflheim_adapters.gemini_llm_adapter import GeminiLLMAdapter
+
+
+def _agent(llm, name="a", system_prompt="SYS"):
+    return Agent(llm=llm, name=name, system_prompt=system_prompt, memory_backend=DictMemory())
+
+
+def test_history_sends_system_prefix_only_with_latest_turn(fake_client):
+    llm = GeminiLLMAdapter(api_key="test-key")
+    agent = _agent(llm)
+
+    async def run():
+        for message in ("one", "two", "three"):
+            await agent.chat(message)
+    asyncio.run(run())
+
+    assert fake_client.requests[-1] == [
+        ("user", "one"), ("model", "R1"),
+        ("user", "two"), ("model", "R2"),
+        ("user", "System: SYS\n\nUser: three"),
+    ]
+
+
+def test_chat_session_is_reused_between_turns(fake_client):
+    llm = GeminiLLMAdapter(api_key="test-key")
+    agent = _agent(llm)
+    started = []
+    start_chat = llm.model.start_chat
+    llm.model.start_chat = lambda history: started.append(len(history)) or start_chat(history=history)
+
+    async def run():
+        for message in ("one", "two", "three", "four"):
+            await agent.chat(message)
+    asyncio.run(run())
+
+    # The first turn skips the session; the second builds it and later turns reuse it
+    assert started == [2]
+    assert len(fake_client.requests) == 4
+
+
+def test_prepare_history_converts_only_new_turns(fake_client):
+    llm = GeminiLLMAdapter(api_key="test-key")
+    agent = _agent(llm)
+    converted = []
+    split_messages = llm._split_messages
+    llm._split_messages = lambda messages: converted.append(len(messages)) or split_messages(messages)
+
+    async def run():
+        for message in ("one", "two", "three"):
+            await agent.chat(message)
+        return await agent.memory.get_messages(agent.session_id)
+    messages = asyncio.run(run())
+
+    assert converted == [2, 2, 2]
+    roles, texts, prefix, _ = llm._prepare_history(messages)
+    assert llm._to_gemini_history(roles, texts) == llm._convert_messages_to_gemini_format(messages)
+    assert prefix == "System: SYS\n\nUser: "
+
+
+def test_conversations_sharing_an_adapter_stay_separate(fake_client):
+    llm = GeminiLLMAdapter(api_key="test-key")
+    first, second = _agent(llm, "a", "SA"), _agent(llm, "b", "SB")
+
+    async def run():
+        for i in range(2):
+            await first.chat(f"a{i}")
+            await second.chat(f"b{i}")
+    asyncio.run(run())
+
+    assert fake_client.requests[-2] == [("user", "a0"), ("model", "R1"), ("user", "System: SA\n\nUser: a1")]
+    assert fake_client.requests[-1] == [("user", "b0"), ("model", "R2"), ("user", "System: SB\n\nUser: b1")]
+
+
+def test_concurrent_turns_get_their_own_session(fake_client):
+    llm = GeminiLLMAdapter(api_key="test-key")
+    agent = _agent(llm)
+
+    async def run():
+        await agent.chat("one")
+        await agent.chat("two")
+        await asyncio.gather(agent.chat("x"), agent.chat("y"))
+    asyncio.run(run())
+
+    assert all(not entry.get("busy") for entry in llm._history_cache.values())
+    assert len(fake_client.requests) == 4
+
+
+def test_stream_response_reuses_session(fake_client):
+    llm = GeminiLLMAdapter(api_key="test-key")
+    agent = _agent(llm)
+
+    async def run():
+        await agent.chat("one")
+        first = [token.content async for token in agent.chat_stream("two")]
+        await agent.chat("three")
+        return first
+    tokens = asyncio.run(run())
+
+    assert "".join(tokens) == "R2 streamed"
+    assert fake_client.requests[-1] == [
+        ("user", "one"), ("model", "R1"),
+        ("user", "two"), ("model", "R2 streamed"),
+        ("user", "System: SYS\n\nUser: three"),
+    ]
+
+
+def test_stream_setup_failure_yields_error_token(fake_client):
+    llm = GeminiLLMAdapter(api_key="test-key")
+
+    async def fail(request):
+        raise RuntimeError("quota")
+    fake_client.stream_generate_content = fail
+
+    async def run():
+        return [token async for token in _agent(llm).chat_stream("one")]
+    tokens = asyncio.run(run())
+
+    assert len(tokens) == 1
+    assert tokens[0].finish_reason == "error"
+    assert "quota" in tokens[0].content
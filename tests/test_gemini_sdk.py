@@ -0,0 +1,68 @@
+"""Tests for the shared helpers in niflheim_adapters._gemini_sdk."""
+
+import asyncio
+from types import SimpleNamespace
+
+from niflheim_adapters import _gemini_sdk
+from niflheim_adapters._gemini_sdk import get_model, iter_text_batches
+
+
+class FakeStream:
+    """Async-iterable streamed response yielding chunks with a .text, after optional delays."""
+
+    def __init__(self, texts, delays=None):
+        self.texts = texts
+        self.delays = delays or [0] * len(texts)
+
+    def __aiter__(self):
+        async def chunks():
+            for text, delay in zip(self.texts, self.delays):
+                await asyncio.sleep(delay)
+                yield SimpleNamespace(text=text)
+        return chunks()
+
+
+def _collect(response):
+    async def run():
+        return [text async for text in iter_text_batches(response)]
+    return asyncio.run(run())
+
+
+def test_batches_keep_all_text_in_order():
+    texts = [f"t{i} " for i in range(100)]
+    batches = _collect(FakeStream(texts))
+
+    assert "".join(batches) == "".join(texts)
+    assert len(batches) < len(texts)
+    assert len(batches[0].split()) == _gemini_sdk.STREAM_BATCH_SIZE
+
+
+def test_empty_chunks_are_skipped():
+    assert _collect(FakeStream(["", "a", "", "b"])) == ["ab"]
+
+
+def test_slow_stream_flushes_on_time():
+    delay = 2 * _gemini_sdk.STREAM_FLUSH_MS / 1000
+    batches = _collect(FakeStream(["a", "b", "c"], [0, delay, delay]))
+
+    assert batches == ["a", "b", "c"]
+
+
+def test_closing_early_cancels_pending_read():
+    async def run():
+        stream = iter_text_batches(FakeStream(["a", "b"], [0, 10]))
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(run()) == "a"
+
+
+def test_get_model_shares_models_and_accepts_list_config(fake_client):
+    first = get_model("test-key", "gemini-1.5-flash", 0.5, 64, {"stop_sequences": ["END"]})
+    second = get_model("test-key", "gemini-1.5-flash", 0.5, 64, {"stop_sequences": ["END"]})
+    other = get_model("test-key", "gemini-1.5-flash", 0.5, 64)
+
+    assert first is second
+    assert first is not other
+    assert first._generation_config["stop_sequences"] == ["END"]
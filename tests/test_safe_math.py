@@ -0,0 +1,50 @@
+"""Tests for examples.safe_math.safe_eval."""
+
+import time
+
+import pytest
+
+from examples.safe_math import MAX_RESULT_BITS, safe_eval
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("25 * 4 + 10", 110),
+    (" 2 ** 10 ", 1024),
+    ("7 // 2", 3),
+    ("7 / 2", 3.5),
+    ("-(3 - 5)", 2),
+    ("2 ** -2", 0.25),
+    ("(-1) ** 99999", -1),
+])
+def test_arithmetic(expression, expected):
+    assert safe_eval(expression) == expected
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os')",
+    "abs(-1)",
+    "True + 1",
+    "'a' * 3",
+    "x + 1",
+    "[1, 2]",
+])
+def test_rejects_anything_but_arithmetic(expression):
+    with pytest.raises(ValueError):
+        safe_eval(expression)
+
+
+def test_rejects_syntax_errors():
+    with pytest.raises(SyntaxError):
+        safe_eval("2 +")
+
+
+@pytest.mark.parametrize("expression", [
+    "9 ** 9 ** 9",
+    f"2 ** {MAX_RESULT_BITS + 1}",
+    "10 ** 1000 * 10 ** 1000",
+])
+def test_huge_results_fail_fast(expression):
+    started = time.perf_counter()
+    with pytest.raises(ValueError, match="too large"):
+        safe_eval(expression)
+    assert time.perf_counter() - started < 1
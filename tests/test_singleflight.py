@@ -0,0 +1,74 @@
+"""Tests for examples.singleflight.SingleFlight."""
+
+import asyncio
+
+import pytest
+
+from examples.singleflight import SingleFlight
+
+
+def test_concurrent_calls_with_same_key_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def work(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", work, 21) for _ in range(5)))
+
+    assert asyncio.run(run()) == [42] * 5
+    assert calls == [21]
+    assert flight.get_stats() == {"hits": 4, "misses": 1, "in_flight": 0}
+
+
+def test_different_keys_and_later_calls_run_again():
+    flight = SingleFlight()
+    calls = []
+
+    async def work(value):
+        calls.append(value)
+        return value
+
+    async def run():
+        await asyncio.gather(flight.do("a", work, 1), flight.do("b", work, 2))
+        await flight.do("a", work, 1)
+
+    asyncio.run(run())
+    assert calls == [1, 2, 1]
+
+
+def test_error_reaches_every_waiter_and_is_not_kept():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        return await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.get_stats()["in_flight"] == 0
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"